@@ -0,0 +1,109 @@
+bl_info = {
+    "name": "Shape Key cleaner",
+    "author": "Tohru",
+    "version": (1, 0),
+    "blender": (2, 80, 0),
+    "location": "View3D > Sidebar > Item Tab",
+    "description": "Removes shape keys that do nothing and zeroes float noise in the rest, on selected mesh objects",
+    "category": "Object",
+}
+
+import bpy
+import numpy as np
+
+
+def read_cos(key_block, num_verts):
+    cos = np.empty(num_verts * 3, dtype=np.float32)
+    key_block.data.foreach_get("co", cos)
+    return cos.reshape(num_verts, 3)
+
+
+class OBJECT_OT_CleanShapeKeys(bpy.types.Operator):
+    """Remove shape keys that don't move any vertex further than the threshold from their relative key"""
+    bl_idname = "object.clean_shape_keys"
+    bl_label = "Clean Shape Keys"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    threshold: bpy.props.FloatProperty(
+        name="Threshold", default=0.0001, min=0.0, precision=6, subtype='DISTANCE',
+        description="Keys whose largest displacement is below this are removed")
+    snap_noise: bpy.props.BoolProperty(
+        name="Snap Noise", default=False,
+        description="In the kept keys, snap vertices that move less than the threshold back onto the relative key "
+                    "(keys other keys are relative to are left alone)")
+
+    def execute(self, context):
+        removed_total = 0
+        snapped_total = 0
+        for obj in context.selected_objects:
+            if obj.type != 'MESH' or obj.data.shape_keys is None:
+                continue
+
+            bpy.context.view_layer.objects.active = obj
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+            key_blocks = obj.data.shape_keys.key_blocks
+            reference = obj.data.shape_keys.reference_key
+            num_verts = len(obj.data.vertices)
+            # Removing a key other keys are relative to would silently
+            # rebase them onto the reference key, and snapping it would
+            # change every dependent's displacement, so those stay as is.
+            used_as_relative = {kb.relative_key.name for kb in key_blocks
+                                if kb.relative_key and kb.relative_key != kb}
+
+            cos = {}
+            to_remove = []
+            for kb in key_blocks:
+                relative = kb.relative_key if kb.relative_key else reference
+                if kb == reference or relative == kb:
+                    continue
+                if relative.name not in cos:
+                    cos[relative.name] = read_cos(relative, num_verts)
+                relative_cos = cos[relative.name]
+                key_cos = cos[kb.name] if kb.name in cos else read_cos(kb, num_verts)
+
+                diffs = key_cos - relative_cos
+                sq_dist = np.einsum('ij,ij->i', diffs, diffs)
+                noise = sq_dist < self.threshold ** 2
+                if noise.all() and kb.name not in used_as_relative:
+                    to_remove.append(kb)
+                elif (self.snap_noise and kb.name not in used_as_relative
+                      and (noise & (sq_dist > 0.0)).any()):
+                    snapped_total += int(np.count_nonzero(noise & (sq_dist > 0.0)))
+                    key_cos = np.where(noise[:, None], relative_cos, key_cos)
+                    kb.data.foreach_set("co", key_cos.ravel())
+
+            for kb in to_remove:
+                obj.shape_key_remove(kb)
+            removed_total += len(to_remove)
+            obj.data.update()
+
+        self.report({'INFO'}, f"Removed {removed_total} shape key(s), snapped {snapped_total} vertex delta(s).")
+        return {'FINISHED'}
+
+
+class VIEW3D_PT_CleanShapeKeysPanel(bpy.types.Panel):
+    bl_label = "Shape Key Cleaner"
+    bl_idname = "VIEW3D_PT_clean_shape_keys"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "Item"
+
+    def draw(self, context):
+        layout = self.layout
+        layout.label(text="Clean Shape Keys:")
+        layout.operator("object.clean_shape_keys", icon='TRASH')
+
+
+def register():
+    bpy.utils.register_class(OBJECT_OT_CleanShapeKeys)
+    bpy.utils.register_class(VIEW3D_PT_CleanShapeKeysPanel)
+
+
+def unregister():
+    bpy.utils.unregister_class(OBJECT_OT_CleanShapeKeys)
+    bpy.utils.unregister_class(VIEW3D_PT_CleanShapeKeysPanel)
+
+
+if __name__ == "__main__":
+    register()
@@ -0,0 +1,351 @@
+"""
+Scaling benchmark for the Blendshape Visualizer rebuild pipeline.
+
+Runs inside Blender:
+    blender --background --python benchmarks/bench_blendshape_visualizer.py -- --output bench.json
+or with plain Python, in which case bpy / gpu are replaced by minimal
+stand-ins (GPU uploads become array copies), so it works on a GPU-less box:
+    python benchmarks/bench_blendshape_visualizer.py --sizes 10000 100000 --output bench.json
+Blender has no GPU in background mode either, so there the meshes and reads
+are real but gpu gets the same stand-ins.
+
+Each case is a synthetic grid mesh with one shape key displacing a
+contiguous band covering the given ratio of vertices.  Stages are timed
+separately and the median of --repeat runs is reported, in seconds:
+
+    read      - spot-checked bulk reads of the basis and the key
+    sanity    - _find_affected (sanity checks + affected mask)
+    topology  - cold MeshTopology build (cached for every later rebuild)
+    faces     - _select_faces: polygons touching the affected vertices and
+                their triangle / edge index arrays
+    analysis  - analyse_shape_key with a warm topology: faces again, LOD
+                levels and spatial chunks
+    upload    - apply_analysis: shared face vertex buffer (cold) and face
+                index batch
+    markers   - line vertex buffer (edges, displacement lines and X
+                markers) and its full-detail line / point batches
+    total     - build_gpu_batches plus the marker batches, cold topology
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import types
+
+import numpy as np
+
+try:
+    import bpy
+    STUBBED = False
+except ImportError:
+    STUBBED = True
+
+
+# --- STAND-INS FOR BLENDER MODULES ---
+
+def _install_stubs(gpu_only=False):
+    """
+    Register just enough of bpy, gpu, blf, gpu_extras, bpy_extras and
+    mathutils for the addon to import; only gpu and gpu_extras if gpu_only.
+    """
+
+    class _Base:
+        pass
+
+    class _ExportHelper:
+        pass
+
+    def _prop(*args, **kwargs):
+        return None
+
+    class _Shader:
+        def bind(self):
+            pass
+
+        def uniform_float(self, name, value):
+            pass
+
+        def uniform_int(self, name, value):
+            pass
+
+    class _Batch:
+        def __init__(self, type=None, buf=None, elem=None):
+            self.type, self.buf, self.elem = type, buf, elem
+
+        def draw(self, shader=None):
+            pass
+
+    class _VertFormat:
+        def attr_add(self, **kwargs):
+            pass
+
+    class _VertBuf:
+        def __init__(self, fmt, length):
+            self.data = {}
+
+        def attr_fill(self, id, data):
+            self.data[id] = np.array(data, dtype=np.float32)
+
+    class _IndexBuf:
+        def __init__(self, type=None, seq=None):
+            self.seq = np.array(seq, dtype=np.int32)
+
+    class _CreateInfo:
+        def __getattr__(self, name):
+            return _prop
+
+    def batch_for_shader(shader, type, content, indices=None):
+        # An upload is at least one copy of every attribute.
+        buf = {k: np.array(v, dtype=np.float32) for k, v in content.items()}
+        return _Batch(type, buf, None if indices is None else np.array(indices, dtype=np.int32))
+
+    gpu = types.ModuleType("gpu")
+    gpu.shader = types.SimpleNamespace(from_builtin=lambda name: _Shader(),
+                                       create_from_info=lambda info: _Shader())
+    gpu.types = types.SimpleNamespace(GPUShader=lambda *a: _Shader(), GPUShaderCreateInfo=_CreateInfo,
+                                      GPUStageInterfaceInfo=lambda name: _CreateInfo(),
+                                      GPUVertFormat=_VertFormat, GPUVertBuf=_VertBuf,
+                                      GPUIndexBuf=_IndexBuf, GPUBatch=_Batch)
+    gpu_extras = types.ModuleType("gpu_extras")
+    gpu_extras.batch = types.ModuleType("gpu_extras.batch")
+    gpu_extras.batch.batch_for_shader = batch_for_shader
+    sys.modules.update({"gpu": gpu, "gpu_extras": gpu_extras, "gpu_extras.batch": gpu_extras.batch})
+    if gpu_only:
+        return
+
+    bpy = types.ModuleType("bpy")
+    bpy.types = types.ModuleType("bpy.types")
+    bpy.types.Operator = bpy.types.Panel = bpy.types.PropertyGroup = _Base
+    bpy.types.Object = _Base
+    bpy.props = types.ModuleType("bpy.props")
+    for name in ("BoolProperty", "FloatProperty", "FloatVectorProperty", "EnumProperty",
+                 "IntProperty", "StringProperty", "PointerProperty"):
+        setattr(bpy.props, name, _prop)
+    bpy.app = types.ModuleType("bpy.app")
+    bpy.app.handlers = types.ModuleType("bpy.app.handlers")
+    bpy.app.handlers.persistent = lambda func: func
+    bpy.app.timers = types.SimpleNamespace(register=_prop, unregister=_prop, is_registered=lambda f: False)
+    bpy.app.version = (0, 0, 0)
+
+    bpy_extras = types.ModuleType("bpy_extras")
+    bpy_extras.io_utils = types.ModuleType("bpy_extras.io_utils")
+    bpy_extras.io_utils.ExportHelper = _ExportHelper
+    mathutils = types.ModuleType("mathutils")
+    mathutils.kdtree = types.ModuleType("mathutils.kdtree")
+    mathutils.kdtree.KDTree = _Base
+
+    sys.modules.update({
+        "bpy": bpy, "bpy.types": bpy.types, "bpy.props": bpy.props,
+        "bpy.app": bpy.app, "bpy.app.handlers": bpy.app.handlers,
+        "bpy_extras": bpy_extras, "bpy_extras.io_utils": bpy_extras.io_utils,
+        "mathutils": mathutils, "mathutils.kdtree": mathutils.kdtree,
+        "blf": types.ModuleType("blf"),
+    })
+
+
+class _Collection:
+    """bpy_prop_collection stand-in backed by NumPy arrays."""
+
+    def __init__(self, length, **arrays):
+        self.length = length
+        self.arrays = arrays
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, i):
+        return types.SimpleNamespace(**{k: tuple(v[i]) if v.ndim > 1 else v[i] for k, v in self.arrays.items()})
+
+    def __iter__(self):
+        return (self[i] for i in range(self.length))
+
+    def foreach_get(self, name, buf):
+        buf[:] = self.arrays[name].ravel()
+
+
+class _KeyBlock:
+    def __init__(self, name, cos, relative_key=None):
+        self.name         = name
+        self.data         = _Collection(len(cos), co=cos)
+        self.relative_key = relative_key or self
+
+
+def _stub_object(name, cos, key_cos, loop_verts, loop_starts, poly_sizes, num_edges):
+    basis = _KeyBlock("Basis", cos)
+    key   = _KeyBlock("Key", key_cos, basis)
+    mesh  = types.SimpleNamespace(
+        vertices=_Collection(len(cos), co=cos),
+        edges=_Collection(num_edges),
+        loops=_Collection(len(loop_verts), vertex_index=loop_verts),
+        polygons=_Collection(len(loop_starts), loop_start=loop_starts, loop_total=poly_sizes),
+        shape_keys=types.SimpleNamespace(key_blocks=[basis, key], reference_key=basis),
+    )
+    mesh.as_pointer = lambda: id(mesh)
+    return types.SimpleNamespace(name=name, type='MESH', data=mesh, active_shape_key=key, mode='OBJECT')
+
+
+def _blender_object(name, cos, key_cos, loop_verts, loop_starts, poly_sizes, num_edges):
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(cos))
+    mesh.vertices.foreach_set("co", cos.ravel())
+    mesh.loops.add(len(loop_verts))
+    mesh.loops.foreach_set("vertex_index", loop_verts)
+    mesh.polygons.add(len(loop_starts))
+    mesh.polygons.foreach_set("loop_start", loop_starts)
+    if bpy.app.version < (4, 0, 0):
+        mesh.polygons.foreach_set("loop_total", poly_sizes)
+    mesh.update(calc_edges=True)
+    obj = bpy.data.objects.new(name, mesh)
+    obj.shape_key_add(name="Basis")
+    key = obj.shape_key_add(name="Key", from_mix=False)
+    key.data.foreach_set("co", key_cos.ravel())
+    obj.active_shape_key_index = 1
+    return obj
+
+
+# --- SYNTHETIC MESHES ---
+
+def make_case(num_verts, ratio, seed=0):
+    """A square grid of about num_verts vertices and a key displacing a band of ratio of them."""
+    side = max(int(round(num_verts ** 0.5)), 2)
+    ys, xs = np.divmod(np.arange(side * side), side)
+    cos = np.stack((xs, ys, np.zeros_like(xs)), axis=1).astype(np.float32) / (side - 1)
+
+    quad = np.arange(side * side).reshape(side, side)[:-1, :-1].ravel()
+    loop_verts  = np.stack((quad, quad + 1, quad + side + 1, quad + side), axis=1).ravel().astype(np.int32)
+    poly_sizes  = np.full(len(quad), 4, dtype=np.int32)
+    loop_starts = np.arange(len(quad), dtype=np.int32) * 4
+    num_edges   = 2 * side * (side - 1)
+
+    # A smooth bump over the lowest-x band holding ratio of the vertices.
+    rng    = np.random.default_rng(seed)
+    band   = cos[:, 0] < np.quantile(cos[:, 0], ratio) if ratio < 1.0 else np.ones(len(cos), dtype=bool)
+    key_cos = cos.copy()
+    key_cos[band, 2] += 0.05 + 0.01 * rng.random(int(band.sum()), dtype=np.float32)
+
+    make = _stub_object if STUBBED else _blender_object
+    return make(f"bench_{side * side}_{ratio}", cos, key_cos, loop_verts, loop_starts, poly_sizes, num_edges)
+
+
+# --- TIMING ---
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def run_case(bv, obj, repeat):
+    mesh       = obj.data
+    num_verts  = len(mesh.vertices)
+    key        = obj.active_shape_key
+    samples    = {}
+    props      = types.SimpleNamespace(use_key_precompute=False, mix_mode=False, use_disk_cache=False)
+    context    = types.SimpleNamespace(active_object=obj, scene=types.SimpleNamespace(blendshape_visualizer=props))
+
+    def record(stage, seconds):
+        samples.setdefault(stage, []).append(seconds)
+
+    for _ in range(repeat):
+        bv._topology_cache.clear()
+        bv._cache.clear()
+        bv._face_vbo_cache.clear()
+
+        (basis_cos, t_basis) = _timed(bv._read_shape_key_cos_safe, key.relative_key, num_verts)
+        (sk_cos, t_key)      = _timed(bv._read_shape_key_cos_safe, key, num_verts)
+        record("read", t_basis + t_key)
+
+        ((_, affected_mask), seconds) = _timed(bv._find_affected, basis_cos, sk_cos)
+        record("sanity", seconds)
+
+        job = bv.prepare_analysis_job(obj)
+        (job.topology, seconds) = _timed(bv.MeshTopology, *job.topology_args)
+        record("topology", seconds)
+
+        (_, seconds) = _timed(bv._select_faces, job.topology, basis_cos, affected_mask)
+        record("faces", seconds)
+
+        (result, seconds) = _timed(bv.analyse_shape_key, job)
+        record("analysis", seconds)
+
+        (_, seconds) = _timed(bv.apply_analysis, result)
+        record("upload", seconds)
+
+        entry = bv._cache.objects[obj.name]
+        (_, seconds) = _timed(entry.use_marker_level, bv._cache.line_shader, len(entry.lod_levels) - 1)
+        record("markers", seconds)
+
+        bv._topology_cache.clear()
+        bv._cache.clear()
+        bv._face_vbo_cache.clear()
+        start = time.perf_counter()
+        bv.build_gpu_batches(context, obj)
+        entry = bv._cache.objects[obj.name]
+        entry.use_marker_level(bv._cache.line_shader, len(entry.lod_levels) - 1)
+        record("total", time.perf_counter() - start)
+
+    entry = bv._cache.objects[obj.name]
+    return {
+        "verts":    num_verts,
+        "polygons": len(mesh.polygons),
+        "affected": 0 if entry.aff_idx is None else len(entry.aff_idx),
+        "tris":     0 if entry.face_tris is None else len(entry.face_tris),
+        "chunks":   0 if entry.chunks is None else entry.chunks.count,
+        "stages":   {stage: statistics.median(times) for stage, times in samples.items()},
+    }
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 500_000, 2_000_000],
+                        help="approximate vertex counts")
+    parser.add_argument("--ratios", type=float, nargs="+", default=[0.01, 0.1, 0.5, 1.0],
+                        help="share of vertices the key displaces")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the median is reported")
+    parser.add_argument("--output", default="bench_blendshape_visualizer.json", help="JSON results file")
+    args = parser.parse_args(argv)
+
+    gpu_stubbed = STUBBED or bpy.app.background
+    if gpu_stubbed:
+        _install_stubs(gpu_only=not STUBBED)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    import blendshape_visualizer as bv
+
+    results = []
+    for size in args.sizes:
+        for ratio in args.ratios:
+            obj  = make_case(size, ratio)
+            case = run_case(bv, obj, args.repeat)
+            case["ratio"] = ratio
+            results.append(case)
+            stages = "  ".join(f"{k}={v * 1000.0:.1f}ms" for k, v in case["stages"].items())
+            print(f"{case['verts']:>9} verts  ratio {ratio:<5}  {stages}")
+            if not STUBBED:
+                mesh = obj.data
+                bpy.data.objects.remove(obj)
+                bpy.data.meshes.remove(mesh)
+
+    report = {
+        "meta": {
+            "stubbed":  STUBBED,
+            "gpu":      not gpu_stubbed,
+            "blender":  None if STUBBED else bpy.app.version_string,
+            "python":   platform.python_version(),
+            "numpy":    np.__version__,
+            "platform": platform.platform(),
+            "repeat":   args.repeat,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    # Under Blender, the script's own arguments follow "--".
+    main(sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:])
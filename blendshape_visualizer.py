@@ -1,12 +1,24 @@
 import bpy
-import bmesh
+import blf
+import csv
 import gpu
+import hashlib
 import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from gpu_extras.batch import batch_for_shader
-from mathutils import Vector
+from bpy.app.handlers import persistent
+from bpy_extras.io_utils import ExportHelper
+from mathutils.kdtree import KDTree
 from bpy.types import Operator, Panel, PropertyGroup
-from bpy.props import BoolProperty, FloatProperty, FloatVectorProperty, EnumProperty, StringProperty
+from bpy.props import BoolProperty, FloatProperty, FloatVectorProperty, EnumProperty, IntProperty, StringProperty
 
 bl_info = {
     "name": "Blendshape Visualizer",
@@ -18,6 +30,7 @@ bl_info = {
 
 # --- GLOBAL DATA ---
 _draw_handler = None
+_overlay_handler = None
 USER_DEFINED_THEMES = {}
 PREDEFINED_THEMES = {
     "Default": {
@@ -39,272 +52,2319 @@ PREDEFINED_THEMES = {
 }
 
 
+# Evenly spaced RGB stops, low displacement first.
+HEATMAP_RAMPS = {
+    'HEAT':      ((0.0, 0.0, 1.0), (0.0, 1.0, 1.0), (0.0, 1.0, 0.0), (1.0, 1.0, 0.0), (1.0, 0.0, 0.0)),
+    'VIRIDIS':   ((0.267, 0.005, 0.329), (0.229, 0.322, 0.546), (0.128, 0.567, 0.551),
+                  (0.369, 0.789, 0.383), (0.993, 0.906, 0.144)),
+    'GRAYSCALE': ((0.0, 0.0, 0.0), (1.0, 1.0, 1.0)),
+}
+
+
 def get_theme_items_callback(self, context):
     items = [(k, k, "") for k in PREDEFINED_THEMES]
     items += [(k, k, "") for k in USER_DEFINED_THEMES]
     return items
 
 
-class VisualizationCache:
+# --- LINE LAYER SHADER ---
+
+# Line layers, in the order of their layer index: the property showing each
+# one, its colour and its line width (X stroke width for the markers).
+_LINE_LAYERS = (
+    ("show_grid_lines",             "grid_line_color", "grid_line_thickness"),
+    ("show_original_x",             "red_x_color",     "red_x_thickness"),
+    ("show_displacement_positions", "green_x_color",   "green_x_thickness"),
+    ("show_displacement_lines",     "line_color",      "line_thickness"),
+)
+
+# Layers drawn as point sprites rather than lines.
+_X_LAYERS = (1 << 1) | (1 << 2)
+
+# Each key has one line vertex buffer: the edge vertices (code 0), then two
+# vertices per affected vertex, one at the basis (code 1) and one that moves
+# by the displacement (code 2).  Drawn as LINES, the pairs are displacement
+# lines; drawn as POINTS, the same vertices are the red and green X
+# markers.  Every vertex sits at pos + scale * delta, so the value preview
+# is a uniform, and vertices of hidden layers are moved outside the clip
+# volume, so showing or hiding a layer only changes the shown bitmask.
+_LINE_VERT_SRC = """
+void main()
+{
+    int l = (points != 0 || code == 0) ? code : 3;
+    gl_Position  = ModelViewProjectionMatrix * vec4(pos + scale * delta, 1.0);
+    gl_PointSize = size;
+    if (((shown >> l) & 1) == 0) {
+        gl_Position = vec4(2.0, 2.0, 2.0, 1.0);
+    }
+    layerColor = colors[l];
+    stroke     = strokes[l];
+}
+"""
+
+# Point sprites keep the X: stroke is the half-width of an arm in sprite units.
+_LINE_FRAG_SRC = """
+void main()
+{
+    if (points != 0) {
+        vec2 p = gl_PointCoord - vec2(0.5);
+        if (min(abs(p.x - p.y), abs(p.x + p.y)) > stroke) {
+            discard;
+        }
+    }
+    fragColor = layerColor;
+}
+"""
+
+
+def _line_shader():
+    """Compile the line layer shader, through create_from_info where available (Blender 3.4+)."""
+    if hasattr(gpu.shader, "create_from_info"):
+        iface = gpu.types.GPUStageInterfaceInfo("line_layer_iface")
+        iface.flat('VEC4',  "layerColor")
+        iface.flat('FLOAT', "stroke")
+        info = gpu.types.GPUShaderCreateInfo()
+        info.push_constant('MAT4',  "ModelViewProjectionMatrix")
+        info.push_constant('VEC4',  "colors",  len(_LINE_LAYERS))
+        info.push_constant('FLOAT', "strokes", len(_LINE_LAYERS))
+        info.push_constant('FLOAT', "scale")
+        info.push_constant('FLOAT', "size")
+        info.push_constant('INT',   "shown")
+        info.push_constant('INT',   "points")
+        info.vertex_in(0, 'VEC3', "pos")
+        info.vertex_in(1, 'VEC3', "delta")
+        info.vertex_in(2, 'INT',  "code")
+        info.vertex_out(iface)
+        info.fragment_out(0, 'VEC4', "fragColor")
+        info.vertex_source(_LINE_VERT_SRC)
+        info.fragment_source(_LINE_FRAG_SRC)
+        return gpu.shader.create_from_info(info)
+    return gpu.types.GPUShader(
+        "uniform mat4 ModelViewProjectionMatrix;\nuniform vec4 colors[%d];\nuniform float strokes[%d];\n"
+        "uniform float scale;\nuniform float size;\nuniform int shown;\nuniform int points;\n"
+        "in vec3 pos;\nin vec3 delta;\nin int code;\n"
+        "flat out vec4 layerColor;\nflat out float stroke;\n" % (len(_LINE_LAYERS), len(_LINE_LAYERS)) + _LINE_VERT_SRC,
+        "uniform int points;\nflat in vec4 layerColor;\nflat in float stroke;\nout vec4 fragColor;\n" + _LINE_FRAG_SRC)
+
+
+def _line_vertex_buffer(pos, delta, code):
+    """Upload the line layer vertex buffer: "pos", "delta" and an integer layer "code" per vertex."""
+    fmt = gpu.types.GPUVertFormat()
+    fmt.attr_add(id="pos",   comp_type='F32', len=3, fetch_mode='FLOAT')
+    fmt.attr_add(id="delta", comp_type='F32', len=3, fetch_mode='FLOAT')
+    fmt.attr_add(id="code",  comp_type='I32', len=1, fetch_mode='INT')
+    vbo = gpu.types.GPUVertBuf(fmt, len(pos))
+    vbo.attr_fill("pos",   pos)
+    vbo.attr_fill("delta", delta)
+    vbo.attr_fill("code",  code)
+    return vbo
+
+
+def _layer_colors(props):
+    return np.array([getattr(props, color)[:] for (_, color, _) in _LINE_LAYERS], dtype=np.float32)
+
+
+def _layer_strokes(props):
+    """X arm half-widths in sprite units (0 for the line layers, which ignore it)."""
+    return np.array([0.7071 * getattr(props, width) / props.marker_size if (_X_LAYERS >> layer) & 1 else 0.0
+                     for (layer, (_, _, width)) in enumerate(_LINE_LAYERS)], dtype=np.float32)
+
+
+def _shown_layers(props):
+    return sum(1 << layer for (layer, (show, _, _)) in enumerate(_LINE_LAYERS) if getattr(props, show))
+
+
+def _line_layer_groups(props):
+    """(line width, shown bitmask) for each distinct width among the shown line (not X) layers."""
+    groups = {}
+    for (layer, (show, _, width)) in enumerate(_LINE_LAYERS):
+        if getattr(props, show) and not (_X_LAYERS >> layer) & 1:
+            width = getattr(props, width)
+            groups[width] = groups.get(width, 0) | (1 << layer)
+    return list(groups.items())
+
+
+class ObjectBatches:
+    """Cached batches for one object's active shape key, in object space."""
+
     def __init__(self):
         self.batches = {}
         self.active_id = None
-        self.shader = gpu.shader.from_builtin('3D_UNIFORM_COLOR')
+        # Affected vertex indices, their basis positions and raw
+        # displacements, kept so LOD levels and chunks can be cut from them,
+        # plus the full key read they came from, which live edit-mode syncs
+        # diff against.
+        self.aff_idx   = None
+        self.aff_basis = None
+        self.aff_delta = None
+        self.sk_cos    = None
+        # Voxel LOD levels of the affected set, coarse to fine: index arrays
+        # into aff_basis (None = all of it) and their marker counts.  Each
+        # level's line / point batches index into the key's line vertex
+        # buffer, which is uploaded once on first use: line_edges are the
+        # edges as index pairs into it and line_first its first marker vertex.
+        self.aff_bounds  = None
+        self.lod_levels  = [None]
+        self.lod_counts  = [0]
+        self.lod_batches = {}
+        self.lod_level   = None
+        self.line_vbo    = None
+        self.line_edges  = None
+        self.line_first  = 0
+        # Spatial chunks for frustum culling (None for small keys), marker
+        # counts per LOD level and chunk, and each chunk's face batch, built
+        # on first use from the shared face vertex buffer.
+        self.chunks           = None
+        self.lod_chunk_counts = None
+        self.chunk_batches    = {}
+        self.face_vbo         = None
+        self.face_edges       = None
+        # Inputs of the heatmap batch, which is built lazily on first use
+        # and recoloured (not re-analysed) when the ramp changes.
+        self.basis_cos = None
+        self.face_tris = None
+        self.magnitude = None
+        self.heatmap_style = None
+        # Per-vertex asymmetry against the key's mirror partner, and the
+        # (active_id, partner name) it was computed for.
+        self.asymmetry    = None
+        self.asymmetry_of = None
 
     def clear(self):
         self.batches.clear()
         self.active_id = None
-
-    def is_valid(self, obj):
+        self.aff_idx   = None
+        self.aff_basis = None
+        self.aff_delta = None
+        self.sk_cos    = None
+        self.aff_bounds  = None
+        self.lod_levels  = [None]
+        self.lod_counts  = [0]
+        self.lod_batches = {}
+        self.lod_level   = None
+        self.line_vbo    = None
+        self.line_edges  = None
+        self.line_first  = 0
+        self.chunks           = None
+        self.lod_chunk_counts = None
+        self.chunk_batches    = {}
+        self.face_vbo         = None
+        self.face_edges       = None
+        self.basis_cos = None
+        self.face_tris = None
+        self.magnitude = None
+        self.heatmap_style = None
+        self.asymmetry    = None
+        self.asymmetry_of = None
+
+    def marker_level(self, budget, visible=None):
+        """
+        Finest LOD level drawing at most budget markers (the coarsest if none
+        fits), counting only the chunks in the visible mask when given.
+        """
+        counts = np.asarray(self.lod_counts)
+        if visible is not None and self.lod_chunk_counts is not None:
+            counts = self.lod_chunk_counts[:, visible].sum(axis=1)
+        fits = np.flatnonzero(counts <= budget)
+        return int(fits[-1]) if len(fits) else 0
+
+    def _line_buffer(self):
+        """Upload the key's line vertex buffer on first use: edge vertices, then two per affected vertex."""
+        if self.line_vbo is not None:
+            return self.line_vbo
+        edges = self.face_edges if self.face_edges is not None else np.empty((0, 2), dtype=np.int32)
+        # Only the vertices the edges use are sent, each once.
+        mask = np.zeros(len(self.basis_cos), dtype=bool)
+        mask[edges] = True
+        used  = np.flatnonzero(mask)
+        remap = np.cumsum(mask, dtype=np.int32) - 1
+        edges = remap[edges]
+        first = len(used)
+        total = first + 2 * len(self.aff_basis)
+        pos   = np.empty((total, 3), dtype=np.float32)
+        delta = np.zeros((total, 3), dtype=np.float32)
+        code  = np.zeros(total, dtype=np.int32)
+        pos[:first] = self.basis_cos[used]
+        pos[first:] = np.repeat(self.aff_basis, 2, axis=0)
+        delta[first + 1::2] = self.aff_delta
+        code[first::2]      = 1
+        code[first + 1::2]  = 2
+        self.line_vbo   = _line_vertex_buffer(pos, delta, code)
+        self.line_edges = edges
+        self.line_first = first
+        _profiler.count(marker_bytes=pos.nbytes + delta.nbytes + code.nbytes)
+        return self.line_vbo
+
+    def _markers(self, shader, level, chunk=None):
+        """
+        The layered batches of LOD level (within chunk, if given), built on
+        first use: 'lines' draws the edges and displacement lines, 'points'
+        both X markers, from the same vertices.
+        """
+        markers = self.lod_batches.get((level, chunk))
+        if markers is not None:
+            return markers
+        start = _profiler.start()
+        vbo   = self._line_buffer()
+        idx   = self.lod_levels[level]
+        edges = self.line_edges
+        if chunk is not None:
+            vert_chunk = self.chunks.vert_chunk
+            idx   = np.flatnonzero(vert_chunk == chunk) if idx is None else idx[vert_chunk[idx] == chunk]
+            edges = edges[self.chunks.edge_offsets[chunk]:self.chunks.edge_offsets[chunk + 1]]
+        if idx is None:
+            idx = np.arange(len(self.aff_basis), dtype=np.int32)
+        ends  = self.line_first + 2 * np.asarray(idx, dtype=np.int32)
+        pairs = np.stack((ends, ends + 1), axis=1)
+        lines = np.concatenate((edges, pairs))
+        markers = self.lod_batches[(level, chunk)] = {}
+        if len(lines):
+            markers['lines'] = _indexed_batch('LINES', vbo, lines)
+        if len(pairs):
+            markers['points'] = _indexed_batch('POINTS', vbo, pairs.reshape(-1))
+        _profiler.count(marker_bytes=lines.nbytes + pairs.nbytes)
+        _profiler.stop("markers", start)
+        return markers
+
+    def patch_deltas(self, at, deltas, magnitude):
+        """
+        Replace the displacements of the affected vertices at positions at
+        (into aff_basis) in place.  The line vertex buffer and every batch
+        drawing from it are dropped; chunk boxes and bounds grow to fit.
+        """
+        self.aff_delta[at] = deltas
+        self.magnitude[self.aff_idx[at]] = magnitude
+        self.heatmap_style = None
+        self.asymmetry_of  = None
+        moved = self.aff_basis[at] + deltas
+        self.aff_bounds = (np.minimum(self.aff_bounds[0], moved.min(axis=0)),
+                           np.maximum(self.aff_bounds[1], moved.max(axis=0)))
+        if self.chunks is not None:
+            vert_chunk = self.chunks.vert_chunk[at]
+            np.minimum.at(self.chunks.lo, vert_chunk, moved)
+            np.maximum.at(self.chunks.hi, vert_chunk, moved)
+        self.line_vbo    = None
+        self.lod_batches = {}
+        self.lod_level   = None
+
+    def use_marker_level(self, shader, level):
+        """Point the whole-object line / point batches at LOD level."""
+        if self.aff_delta is None or level == self.lod_level:
+            return
+        self.batches.pop('lines', None)
+        self.batches.pop('points', None)
+        self.batches.update(self._markers(shader, level))
+        self.lod_level = level
+
+    def chunk_parts(self, shader, level, visible):
+        """One batch dict per chunk in the visible mask, with its faces and LOD level line / point batches."""
+        chunks, parts = self.chunks, []
+        for chunk in np.flatnonzero(visible):
+            part = self.chunk_batches.get(chunk)
+            if part is None:
+                part = self.chunk_batches[chunk] = {}
+                tris = self.face_tris[chunks.tri_offsets[chunk]:chunks.tri_offsets[chunk + 1]]
+                if len(tris):
+                    part['faces'] = _indexed_batch('TRIS', self.face_vbo, tris)
+            parts.append({**part, **self._markers(shader, level, chunk)})
+        return parts
+
+    def heatmap_batch(self, shader, props, values=None):
+        """
+        Return the per-vertex coloured face batch, (re)colouring it if the
+        ramp changed.  values replaces the displacement magnitude as the
+        colour source; whoever changes it must reset heatmap_style.
+        """
+        if self.magnitude is None or self.face_tris is None or not len(self.face_tris):
+            return None
+        style = (_heatmap_style(props), values is not None)
+        if self.heatmap_style != style:
+            colors = _heatmap_colors(self.magnitude if values is None else values,
+                                     _heatmap_stops(props), props.heatmap_alpha)
+            self.batches['heatmap'] = batch_for_shader(
+                shader, 'TRIS', {"pos": self.basis_cos, "color": colors},
+                indices=np.ascontiguousarray(self.face_tris, dtype=np.int32))
+            self.heatmap_style = style
+        return self.batches['heatmap']
+
+    def is_valid(self, obj, mix=False):
         if not obj or not obj.active_shape_key:
             return False
-        # Include mesh data version in the cache key so any mesh edit invalidates the cache
-        mesh_version = obj.data.vertices[0].co[:] if len(obj.data.vertices) > 0 else (0,)
-        return self.active_id == (
-            obj.name,
-            obj.active_shape_key.name,
-            round(obj.active_shape_key.value, 5),
-            obj.data.shape_keys.key_blocks[0].name,  # reference key name
-        )
+        # The key's value is deliberately not part of the identity: the
+        # drawn geometry comes from the raw key data, and the value preview
+        # is a shader uniform applied at draw time.  Neither is the
+        # object's transform, which is applied at draw time.  In mix mode
+        # the values are baked into the geometry and are part of it.
+        return self.active_id == _make_cache_id(obj, obj.active_shape_key, mix)
+
+
+class VisualizationCache:
+    """ObjectBatches for every visualized object, keyed by object name."""
+
+    def __init__(self):
+        self.objects = {}
+        self.shader = gpu.shader.from_builtin('3D_UNIFORM_COLOR')
+        self.line_shader = _line_shader()
+        self.heatmap_shader = gpu.shader.from_builtin('3D_SMOOTH_COLOR')
+
+    def get(self, name):
+        entry = self.objects.get(name)
+        if entry is None:
+            entry = self.objects[name] = ObjectBatches()
+        return entry
+
+    def discard(self, name):
+        self.objects.pop(name, None)
+
+    def retain(self, names):
+        """Evict the entries of objects that are no longer visualized."""
+        for name in [n for n in self.objects if n not in names]:
+            del self.objects[name]
+
+    def clear(self):
+        self.objects.clear()
+
+    def is_valid(self, obj, mix=False):
+        entry = self.objects.get(obj.name) if obj else None
+        return entry is not None and entry.is_valid(obj, mix)
 
 _cache = VisualizationCache()
 
+# --- PROFILING ---
+
+class StageProfiler:
+    """
+    Rolling per-stage timings and the last rebuild's counters, shown in the
+    panel and optionally appended to a JSON-lines log.  While disabled,
+    start() returns None and stop() / count() return at once, and call()
+    is a plain call, so the instrumented code pays one attribute check.
+    """
+    WINDOW = 120    # samples kept per stage
+
+    def __init__(self):
+        self.enabled  = False
+        self.log_path = ""
+        self.log_file = None
+        self.log_fail = None   # path that couldn't be written, until another is set
+        self.times    = {}   # stage -> deque of seconds
+        self.counts   = {}   # counter name -> last value
+        self.lock     = threading.Lock()   # the worker thread records too
+
+    def configure(self, enabled, log_path=""):
+        if log_path == self.log_fail:
+            log_path = ""
+        else:
+            self.log_fail = None
+        if enabled == self.enabled and log_path == self.log_path:
+            return
+        self.close_log()
+        self.enabled  = enabled
+        self.log_path = log_path if enabled else ""
+        if not enabled:
+            self.times.clear()
+            self.counts.clear()
+
+    def start(self):
+        return time.perf_counter() if self.enabled else None
+
+    def stop(self, stage, start):
+        if start is None:
+            return
+        seconds = time.perf_counter() - start
+        with self.lock:
+            samples = self.times.get(stage)
+            if samples is None:
+                samples = self.times[stage] = deque(maxlen=self.WINDOW)
+            samples.append(seconds)
+            self._log({"stage": stage, "ms": round(seconds * 1000.0, 3)})
+
+    def call(self, stage, func, *args):
+        """Return func(*args), timed as stage."""
+        if not self.enabled:
+            return func(*args)
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.stop(stage, start)
+
+    def count(self, **values):
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counts.update(values)
+            self._log({"counts": values})
+
+    def summary(self):
+        """Return (stage, mean ms, max ms, samples) for every recorded stage."""
+        with self.lock:
+            return [(stage, 1000.0 * sum(t) / len(t), 1000.0 * max(t), len(t))
+                    for stage, t in self.times.items() if t]
+
+    def _log(self, record):
+        if not self.log_path:
+            return
+        try:
+            if self.log_file is None:
+                self.log_file = open(self.log_path, "a", buffering=1)
+            record["time"] = round(time.time(), 3)
+            self.log_file.write(json.dumps(record) + "\n")
+        except OSError:
+            self.close_log()
+            # Unwritable: the draw callback configures every redraw, so the
+            # path is remembered rather than retried until it changes.
+            self.log_fail = self.log_path
+            self.log_path = ""
+
+    def close_log(self):
+        if self.log_file is not None:
+            self.log_file.close()
+            self.log_file = None
+
+_profiler = StageProfiler()
+
 # --- THE STABLE ENGINE ---
 
-def _read_shape_key_cos_safe(shape_key, num_verts):
+class ReadStats:
+    """Counters for _read_shape_key_cos_safe, shown in the panel."""
+
+    def __init__(self):
+        self.reads      = 0     # bulk foreach_get reads
+        self.mismatches = 0     # bulk reads that failed the sampled check
+        self.fallbacks  = 0     # slow per-vertex reads
+        self.seconds    = 0.0   # total time spent reading
+
+_read_stats = ReadStats()
+
+
+def _read_shape_key_cos_fallback(shape_key, num_verts):
+    """Per-vertex read (slow but always consistent)."""
+    try:
+        cos = np.array([v.co[:] for v in shape_key.data], dtype=np.float32)
+        return cos.reshape(num_verts, 3)
+    except Exception:
+        return None
+
+
+def _read_shape_key_cos_safe(shape_key, num_verts, out=None):
     """
     Safely read shape key vertex coordinates.
 
     The plain shape_key.data.foreach_get() path can return a zeroed or
     partially-written buffer if Blender's internal depsgraph hasn't
-    finished propagating a shape-key change yet.  We guard against this
-    with two independent reads: if both agree (within float32 noise) we
-    trust the data; if they don't we fall back to the slower per-vertex
-    Python path, which always returns the current committed values.
+    finished propagating a shape-key change yet.  Rather than paying for a
+    second full read to detect that, we spot-check a few evenly spread
+    vertices against the per-vertex accessor, which always returns the
+    current committed values.  A failed check gets one more bulk read;
+    only if that fails too do we take the slow per-vertex path.
+
+    out, if given, is a preallocated (num_verts * 3,) float32 buffer to
+    read into, for callers that don't hold on to the result.
+    """
+    start = time.perf_counter()
+    try:
+        buf = out if out is not None else np.empty(num_verts * 3, dtype=np.float32)
+        cos = buf.reshape(num_verts, 3)
+        sample_idx = _fingerprint_indices(num_verts)
+        for _attempt in range(2):
+            try:
+                shape_key.data.foreach_get("co", buf)
+                sample = _read_sampled_cos(shape_key, sample_idx)
+            except Exception:
+                return None
+            _read_stats.reads += 1
+            if np.allclose(cos[sample_idx], sample, atol=1e-5):
+                return cos
+            _read_stats.mismatches += 1
+
+        _read_stats.fallbacks += 1
+        return _read_shape_key_cos_fallback(shape_key, num_verts)
+    finally:
+        _read_stats.seconds += time.perf_counter() - start
+
+
+# --- TOPOLOGY ENGINE ---
+# Polygons are handled in CSR form: ``corner_verts`` holds every polygon's
+# vertex indices back to back and ``poly_offsets[p]`` is where polygon ``p``
+# starts in it.  Triangles and ring edges are expressed as indices into
+# ``corner_verts`` so they can be computed once and masked per key.
+
+def _read_polygon_layout(mesh):
+    """Return (loop_starts, poly_sizes) for the mesh's polygons."""
+    num_polys   = len(mesh.polygons)
+    loop_starts = np.empty(num_polys, dtype=np.int32)
+    poly_sizes  = np.empty(num_polys, dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    mesh.polygons.foreach_get("loop_total", poly_sizes)
+    return loop_starts, poly_sizes
+
+
+def _csr_polygons(loop_vert_indices, loop_starts, poly_sizes):
+    """Return (corner_verts, poly_offsets) for the polygons described by loop_starts/poly_sizes."""
+    poly_offsets = np.zeros(len(poly_sizes), dtype=np.int64)
+    np.cumsum(poly_sizes[:-1], out=poly_offsets[1:])
+
+    # Gather loops in polygon order; loop_start is not guaranteed to be
+    # monotonic, so don't assume the loop buffer is already CSR-ordered.
+    corner_loops = (np.repeat(loop_starts - poly_offsets, poly_sizes)
+                    + np.arange(int(poly_sizes.sum()), dtype=np.int64))
+    return loop_vert_indices[corner_loops], poly_offsets
+
+
+def _fan_triangles(poly_offsets, poly_sizes):
+    """Fan-triangulate every polygon; return (corner index triples, owning polygon)."""
+    tri_counts = np.maximum(poly_sizes - 2, 0)
+    tri_poly   = np.repeat(np.arange(len(poly_sizes), dtype=np.int32), tri_counts)
+    tri_starts = np.cumsum(tri_counts) - tri_counts
+    fan_step   = np.arange(len(tri_poly), dtype=np.int64) - np.repeat(tri_starts, tri_counts)
+
+    first = poly_offsets[tri_poly]
+    tris  = np.stack((first, first + fan_step + 1, first + fan_step + 2), axis=1)
+    return tris, tri_poly
+
+
+def _ring_edges(poly_offsets, poly_sizes):
+    """Return (corner index pairs, owning polygon) for every polygon's boundary."""
+    num_corners = int(poly_sizes.sum())
+    edge_poly   = np.repeat(np.arange(len(poly_sizes), dtype=np.int32), poly_sizes)
+    corners     = np.arange(num_corners, dtype=np.int64)
+    following   = corners + 1
+    # The last corner of each polygon wraps back to its first corner.
+    following[poly_offsets + poly_sizes - 1] = poly_offsets
+    return np.stack((corners, following), axis=1), edge_poly
+
+
+def _polygons_touching(vert_mask, corner_verts, poly_offsets):
+    """Return a per-polygon bool mask: True where any corner is in vert_mask."""
+    if len(poly_offsets) == 0:
+        return np.zeros(0, dtype=bool)
+    hits = vert_mask[corner_verts].astype(np.int32)
+    return np.add.reduceat(hits, poly_offsets) > 0
+
+
+class MeshTopology:
+    """
+    Everything build_gpu_batches needs from a mesh that depends only on its
+    topology.  Positions are deliberately not stored: shape keys move
+    vertices but never change these arrays, so one instance is shared by
+    every key on the mesh.  Construction is pure NumPy, so it is safe to
+    run on the background analysis thread.
+    """
+
+    def __init__(self, signature, loop_vert_indices, loop_starts, poly_sizes):
+        self.signature         = signature
+        self.loop_vert_indices = loop_vert_indices
+        self.poly_sizes        = poly_sizes
+        self.corner_verts, self.poly_offsets = \
+            _csr_polygons(loop_vert_indices, loop_starts, poly_sizes)
+
+        tris,  self.tri_poly  = _fan_triangles(self.poly_offsets, self.poly_sizes)
+        edges, self.edge_poly = _ring_edges(self.poly_offsets, self.poly_sizes)
+        self.tri_verts  = self.corner_verts[tris]
+        self.edge_verts = self.corner_verts[edges]
+
+    def polygons_touching(self, vert_mask):
+        return _polygons_touching(vert_mask, self.corner_verts, self.poly_offsets)
+
+
+# Keyed by mesh datablock pointer; the signature catches pointer reuse and
+# any topology edit made since the entry was built.  Least recently used
+# entries are dropped beyond _TOPOLOGY_CACHE_SIZE meshes, so meshes that
+# are no longer visualized (or deleted) don't keep their arrays alive.
+_TOPOLOGY_CACHE_SIZE = 8
+_topology_cache = OrderedDict()
+
+
+def _topology_signature(mesh, loop_vert_indices):
+    return (
+        len(mesh.vertices),
+        len(mesh.edges),
+        len(mesh.loops),
+        len(mesh.polygons),
+        zlib.crc32(loop_vert_indices) if loop_vert_indices is not None else None,
+    )
+
+
+def _lookup_mesh_topology(mesh, verify=True):
+    """
+    Return (key, topology, build_args).  On a cache hit topology is the
+    cached MeshTopology; on a miss it is None and MeshTopology(*build_args)
+    builds it without touching bpy.
+
+    verify=False trusts a cached entry whose element counts still match,
+    skipping the loop buffer read and checksum.
+    """
+    key = mesh.as_pointer()
+    if not verify:
+        topo = _topology_cache.get(key)
+        if topo is not None and topo.signature[:4] == _topology_signature(mesh, None)[:4]:
+            _topology_cache.move_to_end(key)
+            return key, topo, None
+
+    # Reading the loop buffer is the cheap part; it's the checksum input.
+    loop_vert_indices = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vert_indices)
+    signature = _topology_signature(mesh, loop_vert_indices)
+
+    topo = _topology_cache.get(key)
+    if topo is not None and topo.signature == signature:
+        _topology_cache.move_to_end(key)
+        return key, topo, None
+    return key, None, (signature, loop_vert_indices) + _read_polygon_layout(mesh)
+
+
+def get_mesh_topology(mesh):
+    """Return the cached MeshTopology for mesh, rebuilding it if the topology changed."""
+    key, topo, build_args = _lookup_mesh_topology(mesh)
+    if topo is None:
+        topo = MeshTopology(*build_args)
+        _remember_topology(key, topo)
+    return topo
+
+
+def _remember_topology(key, topo):
+    _topology_cache[key] = topo
+    _topology_cache.move_to_end(key)
+    while len(_topology_cache) > _TOPOLOGY_CACHE_SIZE:
+        _topology_cache.popitem(last=False)
+
+
+_LOD_MAX_DEPTH = 12     # finest voxel grid is 2**12 cells along the longest axis
+
+
+def _voxel_lod_levels(points):
     """
-    buf_a = np.empty(num_verts * 3, dtype=np.float32)
-    buf_b = np.empty(num_verts * 3, dtype=np.float32)
+    Voxel-grid subsamples of points, coarse to fine.
 
+    Level k keeps the first point of every occupied cell of a grid with
+    2**(k+1) cells along the bounding box's longest side.  Levels stop once
+    a grid keeps most points; the last level is always None (every point).
+    Returns (levels, counts).
+    """
+    n = len(points)
+    levels, counts = [], []
+    lo     = points.min(axis=0)
+    extent = float((points.max(axis=0) - lo).max()) if n else 0.0
+    if extent > 0.0:
+        scaled = (points - lo) / extent
+        for depth in range(1, _LOD_MAX_DEPTH + 1):
+            res   = 1 << depth
+            cells = np.minimum((scaled * res).astype(np.int64), res - 1)
+            _, first = np.unique((cells[:, 0] * res + cells[:, 1]) * res + cells[:, 2], return_index=True)
+            if len(first) * 2 > n:
+                break
+            if not counts or len(first) > counts[-1]:
+                levels.append(np.sort(first).astype(np.int32))
+                counts.append(len(first))
+    levels.append(None)
+    counts.append(n)
+    return levels, counts
+
+
+def _heatmap_stops(props):
+    if props.heatmap_ramp == 'CUSTOM':
+        return (props.heatmap_low_color[:], props.heatmap_high_color[:])
+    return HEATMAP_RAMPS[props.heatmap_ramp]
+
+
+def _heatmap_style(props):
+    """Everything the heatmap colours depend on besides the geometry."""
+    return (tuple(map(tuple, _heatmap_stops(props))), props.heatmap_alpha)
+
+
+def _heatmap_colors(magnitude, stops, alpha):
+    """Map displacement magnitudes to RGBA through an evenly spaced colour ramp."""
+    peak = magnitude.max() if len(magnitude) else 0.0
+    t = magnitude / peak if peak > 0.0 else np.zeros_like(magnitude)
+    stops = np.asarray(stops, dtype=np.float32)
+    xp    = np.linspace(0.0, 1.0, len(stops))
+    colors = np.empty((len(t), 4), dtype=np.float32)
+    for c in range(3):
+        colors[:, c] = np.interp(t, xp, stops[:, c])
+    colors[:, 3] = alpha
+    return colors
+
+
+def _pos_vertex_buffer(coords):
+    """Upload an (N, 3) float32 array as a vertex buffer with a single "pos" attribute."""
+    fmt = gpu.types.GPUVertFormat()
+    fmt.attr_add(id="pos", comp_type='F32', len=3, fetch_mode='FLOAT')
+    vbo = gpu.types.GPUVertBuf(fmt, len(coords))
+    vbo.attr_fill("pos", np.ascontiguousarray(coords, dtype=np.float32))
+    return vbo
+
+
+def _indexed_batch(prim_type, vbo, indices):
+    """Return a batch drawing prim_type primitives from vbo through an index buffer."""
+    ibo = gpu.types.GPUIndexBuf(type=prim_type, seq=np.ascontiguousarray(indices, dtype=np.int32))
+    return gpu.types.GPUBatch(type=prim_type, buf=vbo, elem=ibo)
+
+
+# Face vertex buffers keyed by (mesh pointer, relative key name), with the
+# coordinates they were uploaded from.  Keys sharing a relative key share
+# its upload, so switching between them only sends new index buffers.
+_FACE_VBO_CACHE_SIZE = 8
+_face_vbo_cache = OrderedDict()
+
+
+def _shared_face_vbo(mesh_key, basis_name, basis_cos):
+    """Return (vbo, uploaded): the cached vertex buffer of basis_cos, uploading it on a miss."""
+    key    = (mesh_key, basis_name)
+    cached = _face_vbo_cache.get(key)
+    if cached is not None and (cached[0] is basis_cos or np.array_equal(cached[0], basis_cos)):
+        _face_vbo_cache.move_to_end(key)
+        return cached[1], False
+    vbo = _face_vbo_cache[key] = (basis_cos, _pos_vertex_buffer(basis_cos))
+    _face_vbo_cache.move_to_end(key)
+    while len(_face_vbo_cache) > _FACE_VBO_CACHE_SIZE:
+        _face_vbo_cache.popitem(last=False)
+    return vbo[1], True
+
+
+# --- SPATIAL CHUNKS ---
+
+_CHUNK_GRID      = 4        # cells per axis, so at most 64 chunks per key
+_CHUNK_MIN_ITEMS = 20000    # affected vertices + face triangles below which a key isn't chunked
+
+# Corners of a box as a (8, 3) mask: True picks the max coordinate.
+_BOX_CORNERS = ((np.arange(8)[:, None] >> np.arange(3)) & 1).astype(bool)
+
+
+def _grid_cells(points, lo, hi):
+    """Flat cell id of each point in a _CHUNK_GRID**3 grid over the box lo..hi."""
+    size  = np.maximum(hi - lo, 1e-9)
+    cells = np.clip(((points - lo) / size * _CHUNK_GRID).astype(np.int64), 0, _CHUNK_GRID - 1)
+    return (cells[:, 0] * _CHUNK_GRID + cells[:, 1]) * _CHUNK_GRID + cells[:, 2]
+
+
+def _corner_bounds(corner_cos):
+    """Per-item (lo, hi) of an (N, corners, 3) array; much faster than min(axis=1) for a few corners."""
+    lo = corner_cos[:, 0].copy()
+    hi = lo.copy()
+    for k in range(1, corner_cos.shape[1]):
+        np.minimum(lo, corner_cos[:, k], out=lo)
+        np.maximum(hi, corner_cos[:, k], out=hi)
+    return lo, hi
+
+
+class SpatialChunks:
+    """
+    A key's affected geometry split over a coarse grid, for frustum culling.
+
+    Markers belong to the chunk of their basis position, triangles and
+    edges to the chunk of their box centre; triangles and edges are meant
+    to be reordered by tri_order / edge_order so each chunk is one slice.
+    A chunk's box covers every point it draws, marker ends included.
+    """
+
+    def __init__(self, aff_basis, aff_sk, basis_cos, face_tris, face_edges):
+        # One box per drawn item: a marker spans its basis and key
+        # positions, a triangle or edge its corners.
+        tri_lo,  tri_hi  = _corner_bounds(basis_cos[face_tris])
+        edge_lo, edge_hi = _corner_bounds(basis_cos[face_edges])
+        item_lo = np.concatenate((np.minimum(aff_basis, aff_sk), tri_lo, edge_lo))
+        item_hi = np.concatenate((np.maximum(aff_basis, aff_sk), tri_hi, edge_hi))
+        lo = np.array([item_lo[:, axis].min() for axis in range(3)])
+        hi = np.array([item_hi[:, axis].max() for axis in range(3)])
+
+        # Only occupied cells become chunks.  int16 chunk ids keep every
+        # stable argsort below a radix sort.
+        cells = np.concatenate((_grid_cells(aff_basis, lo, hi),
+                                _grid_cells((tri_lo + tri_hi) * 0.5, lo, hi),
+                                _grid_cells((edge_lo + edge_hi) * 0.5, lo, hi)))
+        occupied = np.bincount(cells, minlength=_CHUNK_GRID ** 3) > 0
+        chunk_of = (np.cumsum(occupied) - 1).astype(np.int16)[cells]
+        n_verts, n_tris = len(aff_basis), len(face_tris)
+        self.count      = int(occupied.sum())
+        self.vert_chunk = chunk_of[:n_verts]
+        tri_chunk       = chunk_of[n_verts:n_verts + n_tris]
+        edge_chunk      = chunk_of[n_verts + n_tris:]
+        bounds          = np.arange(self.count + 1)
+        self.tri_order    = np.argsort(tri_chunk, kind='stable')
+        self.tri_offsets  = np.searchsorted(tri_chunk[self.tri_order], bounds)
+        self.edge_order   = np.argsort(edge_chunk, kind='stable')
+        self.edge_offsets = np.searchsorted(edge_chunk[self.edge_order], bounds)
+
+        # Per-chunk boxes: sort the item boxes by chunk and reduce each run.
+        order   = np.argsort(chunk_of, kind='stable')
+        starts  = np.searchsorted(chunk_of[order], bounds[:-1])
+        self.lo = np.minimum.reduceat(item_lo[order], starts)
+        self.hi = np.maximum.reduceat(item_hi[order], starts)
+
+    @classmethod
+    def from_arrays(cls, vert_chunk, tri_offsets, edge_offsets, lo, hi):
+        """Rebuild already-ordered chunks from their saved arrays (no tri_order / edge_order)."""
+        chunks = cls.__new__(cls)
+        chunks.count        = len(lo)
+        chunks.vert_chunk   = vert_chunk
+        chunks.tri_offsets  = tri_offsets
+        chunks.edge_offsets = edge_offsets
+        # Live edit patches grow the boxes in place.
+        chunks.lo = np.array(lo)
+        chunks.hi = np.array(hi)
+        return chunks
+
+    def level_counts(self, lod_levels):
+        """(levels, chunks) array of how many markers each LOD level puts in each chunk."""
+        return np.stack([
+            np.bincount(self.vert_chunk if idx is None else self.vert_chunk[idx], minlength=self.count)
+            for idx in lod_levels])
+
+    def visible(self, to_clip):
+        """Mask of chunks whose box isn't entirely outside one clip plane (to_clip: object to clip space)."""
+        corners = np.ones((self.count, 8, 4))
+        corners[..., :3] = np.where(_BOX_CORNERS, self.hi[:, None], self.lo[:, None])
+        clip = corners @ to_clip.T
+        xyz, w = clip[..., :3], clip[..., 3:]
+        outside = (xyz < -w).all(axis=1) | (xyz > w).all(axis=1)
+        return ~outside.any(axis=1)
+
+
+# --- KEY PRECOMPUTE CACHE ---
+# Optional mode for flicking through many keys on one mesh: each key's
+# affected vertex indices and displacements are kept in compact form, so
+# switching to a stored key needs no foreach_get at all.  Entries are
+# checked against a handful of per-vertex samples before use, which is
+# enough to notice a key that was edited since it was stored.
+
+_FINGERPRINT_SAMPLES = 16
+
+
+class StoredBasis:
+    """Full coordinates of a key used as some other key's relative key."""
+
+    def __init__(self, cos, sample_idx, sample_cos):
+        self.cos        = cos
+        self.sample_idx = sample_idx
+        self.sample_cos = sample_cos
+
+    @property
+    def nbytes(self):
+        return self.cos.nbytes + self.sample_idx.nbytes + self.sample_cos.nbytes
+
+
+class StoredKey:
+    """
+    A key's affected vertex indices and displacements from its relative key,
+    plus the vertices that move by no more than the display threshold, which
+    aren't drawn but still count in a mix.
+    """
+
+    def __init__(self, aff_idx, deltas, sample_idx, sample_cos, small_idx, small_deltas):
+        self.aff_idx      = aff_idx
+        self.deltas       = deltas
+        self.sample_idx   = sample_idx
+        self.sample_cos   = sample_cos
+        self.small_idx    = small_idx
+        self.small_deltas = small_deltas
+
+    @property
+    def nbytes(self):
+        return (self.aff_idx.nbytes + self.deltas.nbytes
+                + self.sample_idx.nbytes + self.sample_cos.nbytes
+                + self.small_idx.nbytes + self.small_deltas.nbytes)
+
+
+def _fingerprint_indices(num_verts, aff_idx=None):
+    """Vertex indices sampled to fingerprint a key: evenly spread, plus some affected ones."""
+    idx = np.linspace(0, num_verts - 1, min(num_verts, _FINGERPRINT_SAMPLES)).astype(np.int32)
+    if aff_idx is not None and len(aff_idx):
+        picks = np.linspace(0, len(aff_idx) - 1, min(len(aff_idx), _FINGERPRINT_SAMPLES)).astype(np.int64)
+        idx = np.union1d(idx, aff_idx[picks]).astype(np.int32)
+    return idx
+
+
+def _read_sampled_cos(shape_key, sample_idx):
+    data = shape_key.data
+    return np.array([data[i].co[:] for i in sample_idx.tolist()], dtype=np.float32).reshape(-1, 3)
+
+
+def _fingerprint_matches(shape_key, entry):
     try:
-        shape_key.data.foreach_get("co", buf_a)
-        shape_key.data.foreach_get("co", buf_b)
+        return np.allclose(_read_sampled_cos(shape_key, entry.sample_idx), entry.sample_cos, atol=1e-6)
     except Exception:
+        return False
+
+
+class KeyPrecomputeStore:
+    """LRU of StoredBasis / StoredKey entries bounded by a memory budget in bytes."""
+
+    def __init__(self, budget=256 * 1024 * 1024):
+        self.entries = OrderedDict()
+        self.nbytes  = 0
+        self.budget  = budget
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def keys_for(mesh, num_verts, sk, basis):
+        """Return the (basis entry key, shape key entry key) pair for sk."""
+        mesh_key = mesh.as_pointer()
+        return (mesh_key, num_verts, basis.name), (mesh_key, num_verts, sk.name, basis.name)
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        self.discard(key)
+        self.entries[key] = entry
+        self.nbytes += entry.nbytes
+        self.evict()
+
+    def discard(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.nbytes -= entry.nbytes
+
+    def evict(self):
+        while self.nbytes > self.budget and self.entries:
+            _, entry = self.entries.popitem(last=False)
+            self.nbytes -= entry.nbytes
+
+    def set_budget(self, budget):
+        self.budget = budget
+        self.evict()
+
+    def clear(self):
+        self.entries.clear()
+        self.nbytes = 0
+
+    def lookup(self, mesh, num_verts, sk, basis):
+        """Return (StoredBasis, StoredKey) for sk if both are stored and still current, else None."""
+        basis_key, key_key = self.keys_for(mesh, num_verts, sk, basis)
+        stored_basis = self.get(basis_key)
+        stored_key   = self.get(key_key)
+        if stored_basis is None or stored_key is None:
+            return None
+        if not (_fingerprint_matches(basis, stored_basis) and _fingerprint_matches(sk, stored_key)):
+            self.discard(basis_key)
+            self.discard(key_key)
+            return None
+        return stored_basis, stored_key
+
+    def store(self, keys, basis_cos, sk_cos, aff_idx, half_precision):
+        """Store one analysed key, plus its relative key's coordinates if not already stored."""
+        basis_key, key_key = keys
+        if self.get(basis_key) is None:
+            sample_idx = _fingerprint_indices(len(basis_cos))
+            self.put(basis_key, StoredBasis(basis_cos, sample_idx, basis_cos[sample_idx]))
+
+        sample_idx = _fingerprint_indices(len(sk_cos), aff_idx)
+        small_idx  = _small_moves(basis_cos, sk_cos)
+        dtype      = np.float16 if half_precision else np.float32
+        self.put(key_key, StoredKey(aff_idx.astype(np.int32),
+                                    (sk_cos[aff_idx] - basis_cos[aff_idx]).astype(dtype),
+                                    sample_idx, sk_cos[sample_idx], small_idx.astype(np.int32),
+                                    (sk_cos[small_idx] - basis_cos[small_idx]).astype(dtype)))
+
+_key_store = KeyPrecomputeStore()
+
+
+# --- MIX PREVIEW ---
+# Mix mode draws the combined result of every non-muted key at its current
+# value, masked by its vertex group, against the reference key.  Each key's
+# displacement from its relative key comes from _key_store (read and stored
+# on first use), and every object keeps its running weighted sum, so a
+# rebuild after a slider change only re-adds the keys whose weight changed.
+
+class MixState:
+    """Running weighted sum of one object's key displacements."""
+
+    def __init__(self, mesh_key):
+        self.mesh_key = mesh_key
+        # key name -> (signature, aff_idx, deltas, per-vertex weights) of
+        # every term currently added into total.
+        self.terms = {}
+        # float64 so that adding and removing terms many times doesn't drift.
+        self.total = np.zeros((mesh_key[1], 3))
+        # Names of the keys left out of the last mix because a read failed
+        # its sanity checks; they are read again on the next rebuild.
+        self.skipped = []
+
+_mix_states = {}   # object name -> MixState
+
+
+def _mix_signature(obj):
+    """Everything about obj's keys that the mixed result depends on besides their data."""
+    return tuple((kb.name, kb.value, kb.mute, kb.vertex_group, kb.relative_key.name)
+                 for kb in obj.data.shape_keys.key_blocks)
+
+
+def _vertex_group_weights(obj, group_name, idx):
+    """Weights of vertices idx in the named group (0 outside it), or None if there is no such group."""
+    group = obj.vertex_groups.get(group_name)
+    if group is None:
         return None
+    # Vertex group weights have no bulk accessor; only idx is visited.
+    group_index = group.index
+    verts   = obj.data.vertices
+    weights = np.zeros(len(idx), dtype=np.float32)
+    for j, i in enumerate(idx.tolist()):
+        for g in verts[i].groups:
+            if g.group == group_index:
+                weights[j] = g.weight
+                break
+    return weights
+
+
+def _small_moves(basis_cos, sk_cos):
+    """Indices of the vertices that move, but by no more than _find_affected's display threshold."""
+    diffs   = sk_cos - basis_cos
+    sq_dist = np.einsum('ij,ij->i', diffs, diffs)
+    return np.flatnonzero((sq_dist > 0.0) & (sq_dist <= 1e-6))
 
-    # If the two reads disagree the buffer was being written during our read.
-    if not np.allclose(buf_a, buf_b, atol=1e-5):
-        # Fallback: per-vertex read (slow but always consistent)
-        try:
-            cos = np.array([v.co[:] for v in shape_key.data], dtype=np.float32)
-            return cos.reshape(num_verts, 3)
-        except Exception:
+
+def _stored_key_deltas(mesh, num_verts, sk, basis, half_precision, relative_cos=None):
+    """
+    Return (idx, deltas) of every vertex sk moves against basis, however
+    little, from _key_store or read and stored now.  relative_cos, if
+    given, is a dict of relative key reads (by name) shared between calls.
+    """
+    stored = _key_store.lookup(mesh, num_verts, sk, basis)
+    if stored is not None:
+        stored = stored[1]
+        return (np.concatenate((stored.aff_idx, stored.small_idx)),
+                np.concatenate((stored.deltas, stored.small_deltas)))
+    if relative_cos is None:
+        basis_cos = _read_shape_key_cos_safe(basis, num_verts)
+    else:
+        if basis.name not in relative_cos:
+            relative_cos[basis.name] = _read_shape_key_cos_safe(basis, num_verts)
+        basis_cos = relative_cos[basis.name]
+    sk_cos    = _read_shape_key_cos_safe(sk, num_verts)
+    if basis_cos is None or sk_cos is None:
+        return None
+    status, affected_mask = _find_affected(basis_cos, sk_cos)
+    if status == AnalysisResult.REJECTED:
+        return None
+    aff_idx = np.flatnonzero(affected_mask) if affected_mask is not None else np.zeros(0, dtype=np.int64)
+    _key_store.store(KeyPrecomputeStore.keys_for(mesh, num_verts, sk, basis),
+                     basis_cos, sk_cos, aff_idx, half_precision)
+    idx = np.concatenate((aff_idx, _small_moves(basis_cos, sk_cos)))
+    return idx, sk_cos[idx] - basis_cos[idx]
+
+
+def _evaluate_mix(obj, props):
+    """
+    Return the mixed coordinates of obj's keys as float32, or None if the
+    reference key couldn't be read.  Only keys whose value, mask or relative
+    key changed since the last call are read and re-added to the running
+    sum.  A key that can't be read keeps its last good term, if any, and is
+    listed in the state's skipped keys.
+    """
+    mesh       = obj.data
+    shape_keys = mesh.shape_keys
+    reference  = shape_keys.reference_key
+    num_verts  = len(mesh.vertices)
+    mesh_key   = (mesh.as_pointer(), num_verts)
+    state = _mix_states.get(obj.name)
+    if state is None or state.mesh_key != mesh_key:
+        state = _mix_states[obj.name] = MixState(mesh_key)
+
+    wanted = {}
+    for kb in shape_keys.key_blocks:
+        basis = kb.relative_key if kb.relative_key else reference
+        if kb == reference or basis == kb or kb.mute or kb.value == 0.0:
+            continue
+        wanted[kb.name] = (kb, basis, (kb.value, kb.vertex_group, basis.name))
+
+    _key_store.set_budget(props.precompute_budget_mb * 1024 * 1024)
+    half_precision = props.precompute_precision == 'FLOAT16'
+    relative_cos   = {}
+    added   = {}
+    skipped = []
+    for name, (kb, basis, signature) in wanted.items():
+        term = state.terms.get(name)
+        if term is not None and term[0] == signature:
+            continue
+        if term is not None and term[0][1:] == signature[1:]:
+            # Only the value moved: rescale the term, no reads needed.
+            added[name] = (signature, term[1], term[2], term[3] * (kb.value / term[0][0]))
+            continue
+        deltas = _stored_key_deltas(mesh, num_verts, kb, basis, half_precision, relative_cos)
+        if deltas is None:
+            skipped.append(name)
+            continue
+        aff_idx, deltas = deltas
+        weights = np.full(len(aff_idx), kb.value, dtype=np.float32)
+        if kb.vertex_group:
+            mask = _vertex_group_weights(obj, kb.vertex_group, aff_idx)
+            if mask is not None:
+                weights *= mask
+        added[name] = (signature, aff_idx, deltas, weights)
+
+    # Removed terms go in with negated weights; then every change is one
+    # sparse contraction, sum over terms of weights * deltas per vertex.
+    changes = [(term[1], term[2], -term[3]) for name, term in state.terms.items()
+               if name not in wanted or name in added]
+    changes += [(term[1], term[2], term[3]) for term in added.values()]
+    for name in [n for n in state.terms if n not in wanted]:
+        del state.terms[name]
+    state.terms.update(added)
+    state.skipped = skipped
+    if changes:
+        idx     = np.concatenate([c[0] for c in changes])
+        deltas  = np.concatenate([c[1] for c in changes]).astype(np.float64)
+        weights = np.concatenate([c[2] for c in changes])
+        deltas *= weights[:, None]
+        for axis in range(3):
+            state.total[:, axis] += np.bincount(idx, weights=deltas[:, axis], minlength=num_verts)
+
+    reference_cos = _read_shape_key_cos_safe(reference, num_verts)
+    if reference_cos is None:
+        return None
+    return reference_cos, (reference_cos + state.total).astype(np.float32)
+
+
+# --- SYMMETRY ---
+# L/R pairs are found by mirroring every key's displacement field across
+# the object's X axis and comparing it with every other key's.  The fields
+# are compared as count sketches: each (vertex, axis) component is hashed
+# to one of _SKETCH_SIZE buckets with a random sign, which keeps distances
+# between fields on average, so all keys are compared with one matrix
+# product.  Only the best candidates get an exact, per-vertex comparison.
+
+_SKETCH_SIZE = 256
+_REFLECT_X   = np.array((-1.0, 1.0, 1.0), dtype=np.float32)
+
+
+class MirrorMap:
+    """mirror[i] is the vertex at vertex i's position reflected across X, or -1."""
+
+    def __init__(self, mirror, sample_idx, sample_cos):
+        self.mirror     = mirror
+        self.sample_idx = sample_idx
+        self.sample_cos = sample_cos
+
+# Keyed by (topology signature, tolerance); the reference key fingerprint
+# catches a moved basis.
+_mirror_cache = {}
+
+# Object name -> [(key, partner, relative error)] from the last pair search.
+_symmetry_pairs = {}
+
+
+def _build_mirror_map(basis_cos, tolerance):
+    """Match every vertex with its reflection across X through a grid hash, then a KD-tree."""
+    num_verts = len(basis_cos)
+    cells     = np.round(basis_cos / tolerance).astype(np.int64)
+    mirrored  = cells * np.array((-1, 1, 1), dtype=np.int64)
+    _, inverse = np.unique(np.concatenate((cells, mirrored)), axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    vert_of = np.full(int(inverse.max()) + 1, -1, dtype=np.int64)
+    vert_of[inverse[:num_verts]] = np.arange(num_verts)
+    mirror  = vert_of[inverse[num_verts:]]
+
+    # Mirror partners that straddle a cell border land in neighbouring cells.
+    missing = np.flatnonzero(mirror < 0)
+    if len(missing):
+        tree = KDTree(num_verts)
+        for i, co in enumerate(basis_cos.tolist()):
+            tree.insert(co, i)
+        tree.balance()
+        for i in missing.tolist():
+            x, y, z = basis_cos[i].tolist()
+            _co, j, dist = tree.find((-x, y, z))
+            if j is not None and dist <= tolerance:
+                mirror[i] = j
+    return mirror
+
+
+def get_mirror_map(mesh, reference, tolerance):
+    """Return mesh's mirror map, rebuilding it if the topology or the reference key changed."""
+    key   = (get_mesh_topology(mesh).signature, tolerance)
+    entry = _mirror_cache.get(key)
+    if entry is None or not _fingerprint_matches(reference, entry):
+        basis_cos = _read_shape_key_cos_safe(reference, len(mesh.vertices))
+        if basis_cos is None:
             return None
+        sample_idx = _fingerprint_indices(len(basis_cos))
+        entry = _mirror_cache[key] = MirrorMap(_build_mirror_map(basis_cos, tolerance),
+                                               sample_idx, basis_cos[sample_idx])
+    return entry.mirror
 
-    return buf_a.reshape(num_verts, 3)
 
+def _count_sketch(idx, values, buckets, signs):
+    """Sketch of the sparse displacement field values at vertices idx."""
+    return np.bincount(buckets[idx].ravel(), weights=(values * signs[idx]).ravel(),
+                       minlength=_SKETCH_SIZE)
 
-def build_gpu_batches(context):
-    obj = context.active_object
-    if not obj or obj.type != 'MESH' or not obj.active_shape_key:
-        _cache.clear()
+
+def _dense_deltas(num_verts, deltas):
+    dense = np.zeros((num_verts, 3), dtype=np.float32)
+    dense[deltas[0]] = deltas[1]
+    return dense
+
+
+def _asymmetry(mirror, delta_a, delta_b):
+    """Per-vertex distance between dense field delta_a and the mirror image of delta_b."""
+    valid    = mirror >= 0
+    mirrored = np.zeros_like(delta_b)
+    mirrored[valid] = delta_b[mirror[valid]] * _REFLECT_X
+    diff = delta_a - mirrored
+    return np.sqrt(np.einsum('ij,ij->i', diff, diff))
+
+
+def find_symmetric_pairs(obj, props, tolerance, max_error):
+    """
+    Return [(key, partner, relative error)] for obj's likely L/R key pairs,
+    best first, or None if the basis couldn't be read.  The error is the
+    norm of the asymmetry over the larger of the two displacement norms.
+    """
+    mesh      = obj.data
+    reference = mesh.shape_keys.reference_key
+    num_verts = len(mesh.vertices)
+    mirror    = get_mirror_map(mesh, reference, tolerance)
+    if mirror is None:
+        return None
+
+    _key_store.set_budget(props.precompute_budget_mb * 1024 * 1024)
+    half_precision = props.precompute_precision == 'FLOAT16'
+    rng     = np.random.default_rng(0)
+    buckets = rng.integers(0, _SKETCH_SIZE, (num_verts, 3))
+    signs   = rng.choice(np.array((-1.0, 1.0), dtype=np.float32), (num_verts, 3))
+
+    # Keys are streamed; only their two sketches are kept.
+    relative_cos = {}
+    keys, sketches, mirror_sketches = [], [], []
+    for kb in mesh.shape_keys.key_blocks:
+        basis = kb.relative_key if kb.relative_key else reference
+        if kb == reference or basis == kb:
+            continue
+        deltas = _stored_key_deltas(mesh, num_verts, kb, basis, half_precision, relative_cos)
+        if deltas is None or not len(deltas[0]):
+            continue
+        aff_idx = deltas[0]
+        values  = deltas[1].astype(np.float32)
+        has     = mirror[aff_idx] >= 0
+        keys.append((kb, basis))
+        sketches.append(_count_sketch(aff_idx, values, buckets, signs))
+        mirror_sketches.append(_count_sketch(mirror[aff_idx[has]], values[has] * _REFLECT_X, buckets, signs))
+    if len(keys) < 2:
+        return []
+
+    # sq_dist[a, b] ~ |mirror image of a - b|^2, for every pair at once.
+    sketches        = np.array(sketches)
+    mirror_sketches = np.array(mirror_sketches)
+    sq_dist = (np.einsum('ij,ij->i', mirror_sketches, mirror_sketches)[:, None]
+               + np.einsum('ij,ij->i', sketches, sketches)[None, :]
+               - 2.0 * mirror_sketches @ sketches.T)
+    np.fill_diagonal(sq_dist, np.inf)
+    best = sq_dist.argmin(axis=1)
+
+    pairs = []
+    for a, b in enumerate(best.tolist()):
+        if a > b or best[b] != a:
+            continue
+        fetched = [_stored_key_deltas(mesh, num_verts, kb, basis, half_precision, relative_cos)
+                   for kb, basis in (keys[a], keys[b])]
+        if None in fetched:
+            continue
+        delta_a, delta_b = (_dense_deltas(num_verts, deltas) for deltas in fetched)
+        scale = max(np.linalg.norm(delta_a), np.linalg.norm(delta_b))
+        error = float(np.linalg.norm(_asymmetry(mirror, delta_a, delta_b)) / scale)
+        if error <= max_error:
+            pairs.append((keys[a][0].name, keys[b][0].name, error))
+    pairs.sort(key=lambda pair: pair[2])
+    return pairs
+
+
+def _asymmetry_magnitude(obj, entry, props):
+    """Per-vertex asymmetry of obj's active key against its pair partner, or None if it has none."""
+    sk = obj.active_shape_key
+    partner = None
+    for a, b, _error in _symmetry_pairs.get(obj.name, ()):
+        if sk.name in (a, b):
+            partner = b if a == sk.name else a
+            break
+    partner = obj.data.shape_keys.key_blocks.get(partner) if partner else None
+    if partner is None or entry.aff_idx is None or props.mix_mode:
+        return None
+    if entry.asymmetry_of != (entry.active_id, partner.name):
+        mesh      = obj.data
+        num_verts = len(mesh.vertices)
+        mirror    = get_mirror_map(mesh, mesh.shape_keys.reference_key, props.mirror_tolerance)
+        basis     = partner.relative_key if partner.relative_key else mesh.shape_keys.reference_key
+        deltas    = _stored_key_deltas(mesh, num_verts, partner, basis,
+                                       props.precompute_precision == 'FLOAT16')
+        if mirror is None or deltas is None:
+            return None
+        entry.asymmetry = _asymmetry(mirror, _dense_deltas(num_verts, (entry.aff_idx, entry.aff_delta)),
+                                     _dense_deltas(num_verts, deltas))
+        entry.asymmetry_of  = (entry.active_id, partner.name)
+        entry.heatmap_style = None
+    return entry.asymmetry
+
+
+# --- DISK CACHE ---
+# Analysis results are saved next to the .blend, one folder of .npy files
+# per key named after a hash of the two coordinate reads and the mesh
+# topology, so a reopened file finds them without re-analysing.  The
+# reads are still needed (they are what is hashed, and what is drawn),
+# but the sanity checks, topology and geometry building are not.  Arrays
+# are memory-mapped, so only what is drawn is ever loaded.  Every edit
+# leaves a new folder behind, so the least recently used ones are
+# deleted once the folder outgrows its budget.
+
+_SIDECAR_VERSION = 1    # bump whenever the analysis or the folder layout changes
+
+
+def _sidecar_dir():
+    """Disk cache folder of the current .blend, or None while it is unsaved."""
+    filepath = bpy.data.filepath
+    if not filepath:
+        return None
+    stem = os.path.splitext(os.path.basename(filepath))[0]
+    return os.path.join(os.path.dirname(filepath), f"{stem}.blendshape_cache")
+
+
+def _sidecar_digest(job):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((_SIDECAR_VERSION, job.num_verts, job.signature)).encode())
+    digest.update(job.basis_cos)
+    digest.update(job.sk_cos)
+    return digest.hexdigest()
+
+
+def _save_sidecar(directory, digest, result):
+    """Write result's arrays to directory/digest; errors leave no partial entry behind."""
+    arrays = {"aff_idx": result.aff_idx}
+    if result.status == AnalysisResult.OK:
+        levels = [idx for idx in result.lod_levels if idx is not None]
+        arrays.update(
+            aff_magnitude=result.magnitude[result.aff_idx],
+            bounds=np.stack(result.aff_bounds),
+            lod_index=np.concatenate(levels) if levels else np.zeros(0, dtype=np.int32),
+            lod_counts=np.array(result.lod_counts, dtype=np.int64),
+            face_tris=result.face_tris,
+            face_edges=result.face_edges)
+        if result.chunks is not None:
+            chunks = result.chunks
+            arrays.update(
+                chunk_vert=chunks.vert_chunk, chunk_tri_offsets=chunks.tri_offsets,
+                chunk_edge_offsets=chunks.edge_offsets, chunk_lo=chunks.lo, chunk_hi=chunks.hi,
+                lod_chunk_counts=result.lod_chunk_counts)
+    tmp = None
+    try:
+        os.makedirs(directory, exist_ok=True)
+        tmp = tempfile.mkdtemp(dir=directory, prefix=".tmp-")
+        for name, array in arrays.items():
+            np.save(os.path.join(tmp, name + ".npy"), np.ascontiguousarray(array))
+        os.rename(tmp, os.path.join(directory, digest))
+        tmp = None
+    except OSError:
+        pass    # read-only folder, or another worker got there first
+    finally:
+        if tmp is not None:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _load_sidecar(job, directory, digest):
+    """Return the saved AnalysisResult for job, or None when there is no usable entry."""
+    path = os.path.join(directory, digest)
+    if not os.path.isdir(path):
+        return None
+    try:
+        arrays = {name[:-4]: np.load(os.path.join(path, name), mmap_mode='r')
+                  for name in os.listdir(path) if name.endswith(".npy")}
+    except (OSError, ValueError):
+        return None
+    aff_idx = arrays.get("aff_idx")
+    if aff_idx is None:
+        return None
+
+    result = AnalysisResult(job, AnalysisResult.OK if len(aff_idx) else AnalysisResult.EMPTY)
+    result.basis_cos = job.basis_cos
+    result.sk_cos    = job.sk_cos
+    result.aff_idx   = aff_idx
+    if result.status == AnalysisResult.EMPTY:
+        return result
+    try:
+        bounds, counts = arrays["bounds"], arrays["lod_counts"].tolist()
+        starts = np.concatenate(([0], np.cumsum(counts[:-1], dtype=np.int64)))
+        result.lod_levels = [arrays["lod_index"][a:b] for a, b in zip(starts[:-1], starts[1:])] + [None]
+        result.lod_counts = counts
+        result.aff_bounds = (np.array(bounds[0]), np.array(bounds[1]))
+        result.aff_basis  = job.basis_cos[aff_idx]
+        result.aff_delta  = job.sk_cos[aff_idx] - result.aff_basis
+        result.magnitude  = np.zeros(job.num_verts, dtype=np.float32)
+        result.magnitude[aff_idx] = arrays["aff_magnitude"]
+        result.face_tris  = arrays["face_tris"]
+        result.face_edges = arrays["face_edges"]
+        if "chunk_vert" in arrays:
+            result.chunks = SpatialChunks.from_arrays(
+                arrays["chunk_vert"], arrays["chunk_tri_offsets"], arrays["chunk_edge_offsets"],
+                arrays["chunk_lo"], arrays["chunk_hi"])
+            result.lod_chunk_counts = arrays["lod_chunk_counts"]
+    except (KeyError, IndexError, ValueError):
+        return None
+    try:
+        os.utime(path)    # mark as recently used for _prune_sidecar
+    except OSError:
+        pass
+    return result
+
+
+def _prune_sidecar(directory, budget, keep):
+    """Delete the least recently used entries in directory until it fits in budget bytes, sparing keep."""
+    entries = []
+    try:
+        for entry in os.scandir(directory):
+            if entry.is_dir() and not entry.name.startswith(".tmp-"):
+                size = sum(f.stat().st_size for f in os.scandir(entry.path))
+                entries.append((entry.stat().st_mtime, size, entry.name))
+    except OSError:
         return
+    total = sum(size for (_, size, _) in entries)
+    for (_, size, name) in sorted(entries):
+        if total <= budget:
+            break
+        if name != keep:
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+            total -= size
+
+
+def clear_sidecar_cache():
+    """Delete the current .blend's disk cache folder."""
+    directory = _sidecar_dir()
+    if directory is not None:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+# --- ANALYSIS ---
+# A rebuild is split in three so the heavy middle part can run off the main
+# thread: prepare_analysis_job() does every bpy read, analyse_shape_key() is
+# pure NumPy, and apply_analysis() uploads the result to the GPU.
+
+class AnalysisJob:
+    """Validated coordinates read from Blender for one (object, shape key) pair."""
+
+    def __init__(self, cache_id, num_verts, basis_cos, sk_cos, mesh_key, topology, topology_args):
+        self.cache_id      = cache_id
+        self.obj_name      = cache_id[0]
+        self.num_verts     = num_verts
+        self.basis_cos     = basis_cos
+        self.sk_cos        = sk_cos
+        self.mesh_key      = mesh_key
+        self.topology      = topology
+        self.topology_args = topology_args
+        self.signature     = topology.signature if topology is not None else topology_args[0]
+        self.cancelled     = threading.Event()
+        # Name of the key basis_cos comes from: the relative key, or the
+        # reference key in mix mode.
+        self.basis_name    = None
+        # Set when the job is the mixed result of every key (mix mode).
+        self.mix           = False
+        # Set when the key comes from _key_store (sk_cos is then None).
+        self.stored_key    = None
+        # Set when the result should be added to _key_store: (keys, half_precision).
+        self.store_request = None
+        # Set to the disk cache folder when results are saved to / loaded
+        # from disk, and the folder's size limit in bytes.
+        self.sidecar_dir    = None
+        self.sidecar_budget = 0
+
+
+class AnalysisResult:
+    # OK: batches to upload.  EMPTY: nothing to draw for this key.
+    # REJECTED: a sanity check failed; keep the cache and retry next redraw.
+    OK, EMPTY, REJECTED = 'OK', 'EMPTY', 'REJECTED'
+
+    def __init__(self, job, status):
+        self.job         = job
+        self.status      = status
+        self.basis_cos   = None
+        self.sk_cos      = None
+        self.aff_idx     = None
+        self.aff_basis   = None
+        self.aff_delta   = None
+        self.magnitude   = None
+        self.aff_bounds  = None
+        self.lod_levels  = None
+        self.lod_counts  = None
+        self.chunks      = None
+        self.lod_chunk_counts = None
+        self.face_tris   = None
+        self.face_edges  = None
+
+
+def prepare_analysis_job(obj, props=None):
+    """
+    Read everything the analysis needs from obj on the main thread.
+
+    When props enables the key precompute cache, a stored key is used
+    without reading the shape key data at all.
+    Returns None when there is nothing to analyse.
+    """
+    if not obj or obj.type != 'MESH' or not obj.active_shape_key:
+        if obj:
+            _cache.discard(obj.name)
+        return None
 
     sk = obj.active_shape_key
     if not obj.data.shape_keys:
-        return
+        return None
 
     basis = sk.relative_key if sk.relative_key else obj.data.shape_keys.reference_key
     if not basis:
-        return
+        return None
 
     num_verts = len(obj.data.vertices)
     if num_verts == 0:
-        return
+        return None
 
-    # --- SAFE DOUBLE-READ ---
-    # We read both buffers twice and compare.  This is the primary glitch guard.
+    if props is not None and props.mix_mode:
+        # Absolute keys are a timeline blend, not a weighted sum.
+        if not obj.data.shape_keys.use_relative:
+            return None
+        mixed = _evaluate_mix(obj, props)
+        if mixed is None:
+            return None
+        mesh_key, topology, topology_args = _lookup_mesh_topology(obj.data)
+        job = AnalysisJob(_make_cache_id(obj, sk, mix=True), num_verts, mixed[0], mixed[1],
+                          mesh_key, topology, topology_args)
+        job.mix        = True
+        job.basis_name = obj.data.shape_keys.reference_key.name
+        return job
+
+    cache_id      = _make_cache_id(obj, sk)
+    store_request = None
+    if props is not None and props.use_key_precompute:
+        _key_store.set_budget(props.precompute_budget_mb * 1024 * 1024)
+        stored = _key_store.lookup(obj.data, num_verts, sk, basis)
+        if stored is not None:
+            mesh_key, topology, topology_args = _lookup_mesh_topology(obj.data, verify=False)
+            job = AnalysisJob(cache_id, num_verts, stored[0].cos, None,
+                              mesh_key, topology, topology_args)
+            job.stored_key = stored[1]
+            job.basis_name = basis.name
+            return job
+        store_request = (KeyPrecomputeStore.keys_for(obj.data, num_verts, sk, basis),
+                         props.precompute_precision == 'FLOAT16')
+
+    # --- SAFE READ ---
+    # Spot-checked bulk reads.  This is the primary glitch guard.
     basis_cos = _read_shape_key_cos_safe(basis, num_verts)
     sk_cos    = _read_shape_key_cos_safe(sk, num_verts)
 
     if basis_cos is None or sk_cos is None:
         # Data was in an inconsistent state; leave cache as-is and retry next redraw.
-        return
+        return None
+
+    mesh_key, topology, topology_args = _lookup_mesh_topology(obj.data)
+    job = AnalysisJob(cache_id, num_verts, basis_cos, sk_cos,
+                      mesh_key, topology, topology_args)
+    job.store_request = store_request
+    job.basis_name    = basis.name
+    if props is not None and props.use_disk_cache:
+        job.sidecar_dir    = _sidecar_dir()
+        job.sidecar_budget = props.disk_cache_budget_mb * 1024 * 1024
+    return job
+
+
+def _find_affected(basis_cos, sk_cos):
+    """
+    Run the sanity checks on a (basis, key) pair of reads.
 
+    Returns (status, affected_mask): status is None when the reads are
+    usable, otherwise an AnalysisResult status (affected_mask is then None).
+    """
     # --- SANITY CHECKS ---
 
     # 1. If the shape key matches basis exactly there is nothing to draw.
     diffs   = sk_cos - basis_cos
     sq_dist = np.einsum('ij,ij->i', diffs, diffs)   # faster than sum(axis=1)
     if sq_dist.max() < 1e-10:
-        _cache.clear()
-        _cache.active_id = _make_cache_id(obj, sk)
-        return
+        return AnalysisResult.EMPTY, None
 
     # 2. Reject any read where the sk buffer is all-zero but the basis isn't.
     #    (The original "LOCK 2" check, kept as a safety net.)
     if np.sum(np.abs(sk_cos)) < 0.01 and np.sum(np.abs(basis_cos)) > 0.01:
-        return
+        return AnalysisResult.REJECTED, None
 
     # 3. Glitch mask: vertices that landed exactly at the world origin but
     #    weren't there in the basis.  If more than 5 % of *affected* vertices
-    #    are glitched we abort rather than draw explosion lines.
-    zero_verts     = np.all(np.abs(sk_cos)    < 1e-6,  axis=1)
-    was_not_zero   = np.any(np.abs(basis_cos) > 1e-4,  axis=1)
-    glitch_mask    = zero_verts & was_not_zero
-    affected_count = int(np.sum(sq_dist > 1e-6))
-
-    if affected_count > 0 and (np.sum(glitch_mask) / affected_count) > 0.05:
-        return
+    #    are glitched we abort rather than draw explosion lines.  A glitched
+    #    vertex moved by at least 1e-4 - 1e-6 along some axis, so only the
+    #    vertices that moved that far need testing.
+    moved          = np.flatnonzero(sq_dist > 9e-9)
+    zero_verts     = np.all(np.abs(sk_cos[moved])    < 1e-6,  axis=1)
+    was_not_zero   = np.any(np.abs(basis_cos[moved]) > 1e-4,  axis=1)
+    glitch_mask    = np.zeros(len(sq_dist), dtype=bool)
+    glitch_mask[moved[zero_verts & was_not_zero]] = True
+    affected       = sq_dist > 1e-6
+    affected_count = int(np.count_nonzero(affected))
+
+    if affected_count > 0 and (np.count_nonzero(glitch_mask) / affected_count) > 0.05:
+        return AnalysisResult.REJECTED, None
 
     # 4. Outlier check: reject reads where any single displacement is
     #    implausibly large relative to the mesh's own bounding box.
     #    A legitimate blendshape should not displace a vertex by more than
-    #    ~5× the mesh's bounding-box diagonal.
-    bbox_diag = np.linalg.norm(basis_cos.max(axis=0) - basis_cos.min(axis=0))
-    if bbox_diag > 1e-5:
-        max_disp = np.sqrt(sq_dist.max())
-        if max_disp > bbox_diag * 5.0:
-            return
+    #    ~5× the mesh's bounding-box diagonal.  The box of a strided sample
+    #    is never larger than the full one, so it rules out most keys
+    #    without a full pass over basis_cos.
+    max_disp = np.sqrt(sq_dist.max())
+    sample   = basis_cos[::max(1, len(basis_cos) // 64)]
+    if max_disp > np.linalg.norm(sample.max(axis=0) - sample.min(axis=0)) * 5.0:
+        bbox_diag = np.linalg.norm(basis_cos.max(axis=0) - basis_cos.min(axis=0))
+        if bbox_diag > 1e-5 and max_disp > bbox_diag * 5.0:
+            return AnalysisResult.REJECTED, None
 
-    # --- GEOMETRY BUILDING ---
-    affected_mask = (sq_dist > 1e-6) & (~glitch_mask)
-    aff_idx = np.where(affected_mask)[0]
+    return None, affected & ~glitch_mask
 
-    if len(aff_idx) == 0:
-        _cache.clear()
-        _cache.active_id = _make_cache_id(obj, sk)
-        return
 
-    line_coords, red_x, grn_x = [], [], []
-    offset = 0.015
-    for idx in aff_idx:
-        p0 = Vector(basis_cos[idx].tolist())
-        p1 = Vector(sk_cos[idx].tolist())
-        line_coords.extend([p0, p1])
-        red_x.extend([p0 + Vector(( offset,  offset,  offset)),
-                       p0 - Vector(( offset,  offset,  offset)),
-                       p0 + Vector((-offset,  offset,  offset)),
-                       p0 - Vector((-offset,  offset,  offset))])
-        grn_x.extend([p1 + Vector(( offset,  offset,  offset)),
-                       p1 - Vector(( offset,  offset,  offset)),
-                       p1 + Vector((-offset,  offset,  offset)),
-                       p1 - Vector((-offset,  offset,  offset))])
+def _select_faces(topo, basis_cos, affected_mask):
+    """
+    Return (face_tris, face_edges) of the polygons that touch an affected
+    vertex, minus any touching the world origin (degenerate / glitch guard).
+    """
+    at_origin = np.einsum('ij,ij->i', basis_cos, basis_cos) < 1e-7
+    face_mask = topo.polygons_touching(affected_mask) & ~topo.polygons_touching(at_origin)
+    return topo.tri_verts[face_mask[topo.tri_poly]], topo.edge_verts[face_mask[topo.edge_poly]]
+
+
+def analyse_shape_key(job):
+    """Sanity-check the job's reads and compute the geometry to draw.  Pure NumPy, no bpy."""
+    if job.sidecar_dir is None or job.sk_cos is None:
+        return _analyse_reads(job)
+    digest = _sidecar_digest(job)
+    result = _profiler.call("disk cache", _load_sidecar, job, job.sidecar_dir, digest)
+    if result is None:
+        result = _analyse_reads(job)
+        if result.status != AnalysisResult.REJECTED:
+            _save_sidecar(job.sidecar_dir, digest, result)
+            _prune_sidecar(job.sidecar_dir, job.sidecar_budget, digest)
+    return result
+
+
+def _analyse_reads(job):
+    basis_cos = job.basis_cos
+
+    if job.stored_key is not None:
+        # Precomputed key: already validated, only the geometry is left.
+        aff_idx   = job.stored_key.aff_idx
+        aff_basis = basis_cos[aff_idx]
+        aff_sk    = aff_basis + job.stored_key.deltas.astype(np.float32)
+        affected_mask = np.zeros(job.num_verts, dtype=bool)
+        affected_mask[aff_idx] = True
+        # No full key is rebuilt; live edit re-reads the key when it needs one.
+        sk_cos = None
+    else:
+        sk_cos = job.sk_cos
+
+        status, affected_mask = _profiler.call("sanity", _find_affected, basis_cos, sk_cos)
+        if status == AnalysisResult.EMPTY:
+            affected_mask = np.zeros(job.num_verts, dtype=bool)
+        elif status is not None:
+            return AnalysisResult(job, status)
+
+        # --- GEOMETRY BUILDING ---
+        aff_idx   = np.where(affected_mask)[0]
+        aff_basis = basis_cos[aff_idx]
+        aff_sk    = sk_cos[aff_idx]
+
+    result = AnalysisResult(job, AnalysisResult.OK if len(aff_idx) else AnalysisResult.EMPTY)
+    result.basis_cos = basis_cos
+    result.aff_idx   = aff_idx
+    result.sk_cos    = sk_cos
+    if result.status == AnalysisResult.EMPTY:
+        return result
+    if job.cancelled.is_set():
+        return AnalysisResult(job, AnalysisResult.REJECTED)
+
+    # Marker LOD levels.  The marker batches themselves are built per level
+    # on the main thread, the first time the draw callback asks for one.
+    result.lod_levels, result.lod_counts = _voxel_lod_levels(aff_basis)
+    result.aff_bounds  = (np.minimum(aff_basis.min(axis=0), aff_sk.min(axis=0)),
+                          np.maximum(aff_basis.max(axis=0), aff_sk.max(axis=0)))
+    result.aff_basis   = aff_basis
+    result.aff_delta   = aff_sk - aff_basis
+    result.magnitude   = np.zeros(job.num_verts, dtype=np.float32)
+    result.magnitude[aff_idx] = np.sqrt(np.einsum('ij,ij->i', result.aff_delta, result.aff_delta))
 
     # Build face/edge geometry from the VALIDATED basis_cos array.
     # We must NOT use bm.from_mesh(obj.data) or v.co here — those read
     # obj.data vertex positions which can be in a transitional/stale state
     # during shape key switches, producing the long "shooting lines" glitch.
-    # Instead we use the mesh polygon/loop/edge topology (indices only, which
+    # Instead we use the mesh polygon/loop topology (indices only, which
     # are always stable) and look up positions from basis_cos ourselves.
-    face_coords, edge_coords = [], []
-    aff_set = set(int(i) for i in aff_idx)
-    mesh = obj.data
+    if job.topology is None:
+        job.topology = MeshTopology(*job.topology_args)
+    face_tris, face_edges = _profiler.call("faces", _select_faces, job.topology, basis_cos, affected_mask)
+
+    # Large keys are split into spatial chunks for frustum culling, with
+    # triangles and edges reordered so each chunk is a contiguous slice.
+    if len(aff_idx) + len(face_tris) >= _CHUNK_MIN_ITEMS:
+        chunks     = SpatialChunks(aff_basis, aff_sk, basis_cos, face_tris, face_edges)
+        face_tris  = face_tris[chunks.tri_order]
+        face_edges = face_edges[chunks.edge_order]
+        result.chunks = chunks
+        result.lod_chunk_counts = chunks.level_counts(result.lod_levels)
+
+    result.face_tris  = face_tris
+    result.face_edges = face_edges
+    return result
+
+
+def apply_analysis(result):
+    """Upload an AnalysisResult into _cache.  Main thread only."""
+    job = result.job
+    if job.topology is not None:
+        _remember_topology(job.mesh_key, job.topology)
+    if job.store_request is not None and result.sk_cos is not None:
+        keys, half_precision = job.store_request
+        _key_store.store(keys, result.basis_cos, result.sk_cos, result.aff_idx, half_precision)
+
+    entry = _cache.get(job.obj_name)
+    if result.status == AnalysisResult.EMPTY:
+        entry.clear()
+        entry.active_id = job.cache_id
+        entry.basis_cos = result.basis_cos
+        entry.sk_cos    = result.sk_cos
+        return
+    if result.status != AnalysisResult.OK:
+        return
 
-    # Collect loop indices per polygon once (avoids repeated attribute access)
-    polys = mesh.polygons
-    loops = mesh.loops
+    entry.aff_idx     = result.aff_idx
+    entry.aff_basis   = result.aff_basis
+    entry.aff_delta   = result.aff_delta
+    entry.sk_cos      = result.sk_cos
+    entry.aff_bounds  = result.aff_bounds
+    entry.lod_levels  = result.lod_levels
+    entry.lod_counts  = result.lod_counts
+    entry.lod_batches = {}
+    entry.lod_level   = None
+    entry.line_vbo    = None
+    entry.chunks           = result.chunks
+    entry.lod_chunk_counts = result.lod_chunk_counts
+    entry.chunk_batches    = {}
+    entry.face_edges       = result.face_edges
+    entry.basis_cos   = result.basis_cos
+    entry.face_tris   = result.face_tris
+    entry.magnitude   = result.magnitude
+    entry.heatmap_style = None
+    entry.batches.pop('heatmap', None)
+
+    # The whole-object and chunk face batches index into one upload of
+    # basis_cos, shared with every other key on the same relative key, so
+    # a key switch only sends its triangle indices.  Edges go in the
+    # layered line batches.
+    entry.batches.pop('faces', None)
+    entry.batches.pop('lines', None)
+    entry.batches.pop('points', None)
+    entry.face_vbo = None
+    upload_bytes   = 0
+    if len(result.face_tris):
+        vbo, uploaded = _shared_face_vbo(job.mesh_key, job.basis_name, result.basis_cos)
+        entry.face_vbo = vbo
+        entry.batches['faces'] = _indexed_batch('TRIS', vbo, result.face_tris)
+        upload_bytes = result.face_tris.nbytes + (result.basis_cos.nbytes if uploaded else 0)
+    entry.active_id = job.cache_id
+
+    _profiler.count(
+        verts=job.num_verts,
+        polygons=job.signature[3],
+        affected=len(result.aff_idx),
+        tris=len(result.face_tris),
+        upload_bytes=upload_bytes)
+
+
+def build_gpu_batches(context, obj=None):
+    """Synchronously rebuild the batches for obj's (default: the active object's) active shape key."""
+    job = _profiler.call("read", prepare_analysis_job,
+                         obj or context.active_object, context.scene.blendshape_visualizer)
+    if job is None:
+        return
+    result = _profiler.call("analysis", analyse_shape_key, job)
+    _profiler.call("upload", apply_analysis, result)
 
-    # Read all loop vertex indices in one shot — always safe, it's just ints
-    loop_vert_indices = np.empty(len(loops), dtype=np.int32)
-    loops.foreach_get("vertex_index", loop_vert_indices)
 
-    for poly in polys:
-        ls = poly.loop_start
-        lc = poly.loop_total
-        verts_of_poly = loop_vert_indices[ls: ls + lc]
+def _make_cache_id(obj, sk, mix=False):
+    if mix:
+        return (obj.name, None, obj.data.shape_keys.key_blocks[0].name, _mix_signature(obj))
+    return (
+        obj.name,
+        sk.name,
+        obj.data.shape_keys.key_blocks[0].name,
+    )
 
-        if not aff_set.isdisjoint(verts_of_poly):
-            f_cos = basis_cos[verts_of_poly]  # shape (n, 3), from our safe buffer
+# --- BACKGROUND ANALYSIS ---
 
-            # Skip faces that touch the world origin (degenerate / glitch guard)
-            if np.any(np.einsum('ij,ij->i', f_cos, f_cos) < 1e-7):
-                continue
+class BackgroundAnalysis:
+    """
+    Runs analyse_shape_key() on a single worker thread.  NumPy releases the
+    GIL for most of it, so the viewport keeps drawing the previous batches
+    while the new ones are computed.  Results come back to the main thread
+    through a bpy.app.timers poll, which is the only place that uploads.
+    At most one job is pending per object.
+    """
 
-            # Fan triangulation
-            for i in range(1, lc - 1):
-                face_coords.extend([f_cos[0], f_cos[i], f_cos[i + 1]])
+    def __init__(self):
+        self.executor = None
+        self.jobs     = {}   # object name -> (AnalysisJob, Future)
 
-            # Edges: consecutive vert pairs around the polygon loop
-            for i in range(lc):
-                edge_coords.extend([f_cos[i], f_cos[(i + 1) % lc]])
+    def pending_id(self, name):
+        pending = self.jobs.get(name)
+        return pending[0].cache_id if pending else None
 
-    shader = _cache.shader
-    _cache.batches['lines']    = batch_for_shader(shader, 'LINES', {"pos": line_coords})
-    _cache.batches['red_x']    = batch_for_shader(shader, 'LINES', {"pos": red_x})
-    _cache.batches['green_x']  = batch_for_shader(shader, 'LINES', {"pos": grn_x})
-    _cache.batches['faces']    = batch_for_shader(shader, 'TRIS',  {"pos": face_coords})
-    _cache.batches['edges']    = batch_for_shader(shader, 'LINES', {"pos": edge_coords})
-    _cache.active_id = _make_cache_id(obj, sk)
+    def submit(self, job):
+        self.cancel(job.obj_name)
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="blendshape_visualizer")
+        self.jobs[job.obj_name] = (job, self.executor.submit(_profiler.call, "analysis", analyse_shape_key, job))
+        if not bpy.app.timers.is_registered(_poll_background_analysis):
+            bpy.app.timers.register(_poll_background_analysis, first_interval=0.01)
 
+    def cancel(self, name):
+        pending = self.jobs.pop(name, None)
+        if pending:
+            pending[0].cancelled.set()
+            pending[1].cancel()
 
-def _make_cache_id(obj, sk):
-    return (
-        obj.name,
-        sk.name,
-        round(sk.value, 5),
-        obj.data.shape_keys.key_blocks[0].name,
-    )
+    def retain(self, names):
+        for name in [n for n in self.jobs if n not in names]:
+            self.cancel(name)
 
-# --- DRAW CALLBACK ---
+    def cancel_all(self):
+        self.retain(())
+
+    def shutdown(self):
+        self.cancel_all()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+_worker = BackgroundAnalysis()
 
-def draw_visualizer_callback():
-    context = bpy.context
-    props   = context.scene.blendshape_visualizer
-    if not props.toggle_visualization:
-        return
 
-    obj = context.active_object
-    if not obj or obj.type != 'MESH':
+def request_background_analysis(obj, props, playing=False):
+    """
+    Queue a rebuild for obj's active key unless one is already running for
+    it.  During playback a running mix job counts even though the values
+    have moved on since it started; restarting it every time they change
+    would mean it never finishes.
+    """
+    cache_id = _make_cache_id(obj, obj.active_shape_key, props.mix_mode)
+    pending  = _worker.pending_id(obj.name)
+    if pending == cache_id or (playing and props.mix_mode and pending is not None
+                               and pending[:3] == cache_id[:3]):
+        return
+    # A job for a key we've since left is stale either way.
+    _worker.cancel(obj.name)
+    job = _profiler.call("read", prepare_analysis_job, obj, props)
+    if job is None:
         return
+    _worker.submit(job)
 
-    # Rebuild if stale.  We catch any exception so a transient Blender
-    # internal error never crashes the whole viewport draw loop.
-    if not _cache.is_valid(obj):
+
+def _tag_view3d_redraw():
+    for window in bpy.context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+
+def _poll_background_analysis():
+    redraw = False
+    for name, (job, future) in list(_worker.jobs.items()):
+        if not future.done():
+            continue
+        del _worker.jobs[name]
+        if future.cancelled() or job.cancelled.is_set():
+            continue
         try:
-            build_gpu_batches(context)
+            result = future.result()
         except Exception:
-            return
-
-    # If we still have nothing to draw, bail out cleanly.
-    if not _cache.batches:
+            continue
+
+        # Drop results for a key that is no longer the one being shown.  A
+        # mix result for values that have changed since is still the
+        # closest geometry there is: it is drawn, and as its id no longer
+        # matches, the draw callback queues the next refresh.
+        obj = bpy.data.objects.get(name)
+        if not obj or obj.type != 'MESH' or not obj.active_shape_key or not obj.data.shape_keys:
+            continue
+        cache_id = _make_cache_id(obj, obj.active_shape_key, job.mix)
+        if (cache_id[:3] != job.cache_id[:3]) if job.mix else (cache_id != job.cache_id):
+            continue
+
+        _profiler.call("upload", apply_analysis, result)
+        # A REJECTED read is retried on the next natural redraw, not forced
+        # here, otherwise a persistently bad read would spin the worker.
+        redraw |= result.status != AnalysisResult.REJECTED
+
+    if redraw:
+        _tag_view3d_redraw()
+    return 0.02 if _worker.jobs else None
+
+
+def draw_status_overlay_callback():
+    """POST_PIXEL overlay shown while a background rebuild is running."""
+    props = bpy.context.scene.blendshape_visualizer
+    if not props.toggle_visualization or not _worker.jobs:
+        return
+    font_id = 0
+    blf.position(font_id, 20, 30, 0)
+    try:
+        blf.size(font_id, 14)
+    except TypeError:
+        blf.size(font_id, 14, 72)
+    blf.color(font_id, 1.0, 1.0, 1.0, 0.8)
+    blf.draw(font_id, "Blendshape Visualizer: computing…")
+
+# --- LIVE EDIT MODE ---
+
+# In Edit Mode the key data lives in the edit mesh, and shape_key.data only
+# catches up on update_from_editmode().  A depsgraph handler collects the
+# edited objects and a throttled timer syncs them.  GPU vertex buffers
+# can't be updated in sub-ranges from Python, so a small edit instead
+# patches the cached arrays and rebuilds only the batches it touches.
+# update_from_editmode() itself tags a geometry update; the one that
+# follows a sync is ignored, or the timer would keep re-syncing.
+_EDIT_SYNC_INTERVAL  = 0.1    # seconds between syncs while editing
+_EDIT_PATCH_FRACTION = 0.05   # changed-vertex share above which a key is re-analysed instead
+
+_edit_dirty  = set()
+_edit_synced = {}   # object name -> time until which its next geometry update is our own
+_edit_reads  = {}   # object name -> (key, relative key, basis_cos, sk_cos) last synced in mix mode
+
+
+@persistent
+def _on_depsgraph_update(scene, depsgraph):
+    props = getattr(scene, "blendshape_visualizer", None)
+    if props is None or not props.toggle_visualization or not props.live_edit_mode:
         return
+    now = time.monotonic()
+    for update in depsgraph.updates:
+        obj = getattr(update.id, "original", update.id)
+        if not (isinstance(obj, bpy.types.Object) and obj.mode == 'EDIT' and update.is_updated_geometry):
+            continue
+        if _edit_synced.pop(obj.name, 0.0) > now or obj.name not in _cache.objects:
+            continue
+        _edit_dirty.add(obj.name)
+    if _edit_dirty and not bpy.app.timers.is_registered(_sync_edit_mode):
+        bpy.app.timers.register(_sync_edit_mode, first_interval=_EDIT_SYNC_INTERVAL)
+
+
+def _sync_edit_mode():
+    """Timer: load the edited objects' key data and patch or invalidate their batches."""
+    redraw = False
+    names  = list(_edit_dirty)
+    mix    = bpy.context.scene.blendshape_visualizer.mix_mode
+    _edit_dirty.clear()
+    for name in names:
+        obj   = bpy.data.objects.get(name)
+        entry = _cache.objects.get(name)
+        if obj is None or obj.mode != 'EDIT' or not obj.active_shape_key:
+            _edit_reads.pop(name, None)
+            continue
+        if entry is None or not entry.is_valid(obj, mix):
+            continue
+        try:
+            obj.update_from_editmode()
+            _edit_synced[name] = time.monotonic() + _EDIT_SYNC_INTERVAL
+            redraw |= _forget_mixed_key(obj, entry) if mix else _patch_edited_key(obj, entry)
+        except Exception:
+            continue
+    if redraw:
+        _tag_view3d_redraw()
+    return None
+
+
+def _patch_edited_key(obj, entry):
+    """
+    Bring entry up to date with obj's freshly loaded key data, returning
+    whether anything changed.  An edit that only moves a few affected
+    vertices is patched in place; anything else (a moved basis, vertices
+    entering or leaving the affected set, a large edit) invalidates entry
+    so the draw callback re-analyses the key.
+    """
+    sk        = obj.active_shape_key
+    basis     = sk.relative_key if sk.relative_key else obj.data.shape_keys.reference_key
+    num_verts = len(obj.data.vertices)
+    if entry.sk_cos is None or len(entry.sk_cos) != num_verts:
+        # Nothing to diff against (e.g. the key came from _key_store).
+        for key in KeyPrecomputeStore.keys_for(obj.data, num_verts, sk, basis):
+            _key_store.discard(key)
+        entry.active_id = None
+        return True
+
+    basis_cos = _read_shape_key_cos_safe(basis, num_verts)
+    sk_cos    = _read_shape_key_cos_safe(sk, num_verts)
+    if basis_cos is None or sk_cos is None:
+        return False
+    changed     = np.flatnonzero((sk_cos != entry.sk_cos).any(axis=1))
+    basis_moved = not np.array_equal(basis_cos, entry.basis_cos)
+    if not len(changed) and not basis_moved:
+        return False
+
+    # A stored copy of this key is stale whatever happens next.
+    for key in KeyPrecomputeStore.keys_for(obj.data, num_verts, sk, basis):
+        _key_store.discard(key)
+
+    deltas  = sk_cos[changed] - basis_cos[changed]
+    sq_dist = np.einsum('ij,ij->i', deltas, deltas)
+    aff_idx = entry.aff_idx if entry.aff_idx is not None else np.empty(0, dtype=np.int64)
+    at      = np.searchsorted(aff_idx, changed)
+    was_affected = at < len(aff_idx)
+    was_affected[was_affected] = aff_idx[at[was_affected]] == changed[was_affected]
+    # Same affected threshold as _find_affected.
+    if (basis_moved or len(changed) > num_verts * _EDIT_PATCH_FRACTION
+            or ((sq_dist > 1e-6) != was_affected).any()):
+        entry.active_id = None
+        return True
+
+    entry.sk_cos = sk_cos
+    if was_affected.any():
+        entry.patch_deltas(at[was_affected], deltas[was_affected], np.sqrt(sq_dist[was_affected]))
+    return True
+
+
+def _forget_mixed_key(obj, entry):
+    """
+    Mix mode: if the edited key's data changed since the last sync, drop
+    everything derived from it so the mix is re-evaluated.  The first sync
+    of a key has nothing to diff against and always counts as a change.
+    """
+    sk        = obj.active_shape_key
+    basis     = sk.relative_key if sk.relative_key else obj.data.shape_keys.reference_key
+    num_verts = len(obj.data.vertices)
+    basis_cos = _read_shape_key_cos_safe(basis, num_verts)
+    sk_cos    = _read_shape_key_cos_safe(sk, num_verts)
+    if basis_cos is None or sk_cos is None:
+        return False
+    last = _edit_reads.get(obj.name)
+    _edit_reads[obj.name] = (sk.name, basis.name, basis_cos, sk_cos)
+    if (last is not None and last[:2] == (sk.name, basis.name)
+            and np.array_equal(last[2], basis_cos) and np.array_equal(last[3], sk_cos)):
+        return False
+
+    # The key itself, and the key as the relative key of others.
+    for key in KeyPrecomputeStore.keys_for(obj.data, num_verts, sk, basis):
+        _key_store.discard(key)
+    _key_store.discard((obj.data.as_pointer(), num_verts, sk.name))
+    _mix_states.pop(obj.name, None)
+    entry.active_id = None
+    return True
+
+# --- PLAYBACK ---
+# A single key's value only drives the marker scale uniform, so playback
+# never rebuilds it.  Mix mode bakes every value into the geometry, which
+# would mean a full rebuild per frame; while the timeline plays, its last
+# geometry keeps being drawn and is refreshed every playback_interval
+# frames instead.
+
+class PlaybackState:
+    """Frames played since mix-mode geometry was last refreshed."""
+
+    def __init__(self):
+        self.frames = 0
+
+_playback = PlaybackState()
+
+
+@persistent
+def _on_frame_change(scene, depsgraph=None):
+    props = getattr(scene, "blendshape_visualizer", None)
+    if props is not None and props.toggle_visualization and props.playback_mode:
+        _playback.frames += 1
 
-    shader = _cache.shader
-    shader.bind()
 
-    if props.show_face_fill and 'faces' in _cache.batches:
+def _is_playing(context, props):
+    screen = context.screen
+    return props.playback_mode and screen is not None and screen.is_animation_playing
+
+
+def _has_mix_geometry(obj):
+    """True when obj's cache holds mix-mode geometry, possibly for other key values."""
+    entry = _cache.objects.get(obj.name)
+    return (entry is not None and entry.active_id is not None
+            and entry.active_id[:3] == _make_cache_id(obj, obj.active_shape_key, mix=True)[:3])
+
+# --- DRAW CALLBACK ---
+
+def _visualized_objects(context, props):
+    """Mesh objects whose active shape key is drawn: all selected ones, or just the active one."""
+    active = context.active_object
+    if props.multi_object:
+        objs = [o for o in context.selected_objects if o.type == 'MESH']
+    else:
+        objs = [active] if active and active.type == 'MESH' else []
+    return [o for o in objs if o.active_shape_key]
+
+
+def _screen_fraction(region, to_clip, bounds):
+    """Fraction (0..1) of the region's larger side spanned by the object-space box bounds."""
+    if region is None or to_clip is None or bounds is None:
+        return 1.0
+    corners = np.ones((8, 4))
+    corners[:, :3] = np.where(_BOX_CORNERS, bounds[1], bounds[0])
+    clip = corners @ to_clip.T
+    w    = clip[:, 3]
+    if (w <= 1e-6).any():
+        return 1.0  # box reaches behind the view: treat it as filling the screen
+    ndc  = clip[:, :2] / w[:, None]
+    span = (ndc.max(axis=0) - ndc.min(axis=0)) * 0.5 * (region.width, region.height)
+    return float(min(1.0, span.max() / max(region.width, region.height, 1)))
+
+
+def _draw_layer(parts, key, shader, color):
+    shader.uniform_float("color", color)
+    _draw_layer_batches(parts, key, shader)
+
+
+def _draw_layer_batches(parts, key, shader):
+    for batches in parts:
+        batch = batches.get(key)
+        if batch is not None:
+            batch.draw(shader)
+
+
+def _draw_object_batches(parts, props, value_scale):
+    """
+    Draw the face fill, then every shown line layer, for each batch dict in
+    parts (visible chunks or the whole object).
+    """
+    if props.show_face_fill:
+        shader = _cache.shader
+        shader.bind()
         gpu.state.blend_set('ALPHA')
-        shader.uniform_float("color", props.face_highlight_color)
-        _cache.batches['faces'].draw(shader)
+        _draw_layer(parts, 'faces', shader, props.face_highlight_color)
 
-    if props.show_grid_lines and 'edges' in _cache.batches:
-        gpu.state.line_width_set(props.grid_line_thickness)
-        shader.uniform_float("color", props.grid_line_color)
-        _cache.batches['edges'].draw(shader)
+    shown = _shown_layers(props)
+    if not shown:
+        return
+    shader = _cache.line_shader
+    shader.bind()
+    shader.uniform_float("scale", value_scale)
+    shader.uniform_float("size", props.marker_size)
+    shader.uniform_vector_float(shader.uniform_from_name("colors"), _layer_colors(props), 4, len(_LINE_LAYERS))
+    shader.uniform_vector_float(shader.uniform_from_name("strokes"), _layer_strokes(props), 1, len(_LINE_LAYERS))
+
+    # Line width is per draw call, not per vertex: the line layers are only
+    # split into separate draws of the same batch when their widths differ.
+    shader.uniform_int("points", 0)
+    for (width, mask) in _line_layer_groups(props):
+        gpu.state.line_width_set(width)
+        shader.uniform_int("shown", mask)
+        _draw_layer_batches(parts, 'lines', shader)
+
+    # Both X layers are one draw of the line ends as point sprites, each X
+    # taking the stroke width of its own layer.
+    if shown & _X_LAYERS:
+        gpu.state.program_point_size_set(True)
+        shader.uniform_int("points", 1)
+        shader.uniform_int("shown", shown & _X_LAYERS)
+        _draw_layer_batches(parts, 'points', shader)
+        gpu.state.program_point_size_set(False)
 
-    if props.show_original_x and 'red_x' in _cache.batches:
-        gpu.state.line_width_set(props.red_x_thickness)
-        shader.uniform_float("color", props.red_x_color)
-        _cache.batches['red_x'].draw(shader)
 
-    if props.show_displacement_positions and 'green_x' in _cache.batches:
-        gpu.state.line_width_set(props.green_x_thickness)
-        shader.uniform_float("color", props.green_x_color)
-        _cache.batches['green_x'].draw(shader)
+def draw_visualizer_callback():
+    context = bpy.context
+    props   = context.scene.blendshape_visualizer
+    if not props.toggle_visualization:
+        return
+    _profiler.configure(props.profiling, bpy.path.abspath(props.profile_log_path))
+    start = _profiler.start()
+
+    objs  = _visualized_objects(context, props)
+    names = {obj.name for obj in objs}
+    _cache.retain(names)
+    _worker.retain(names)
 
-    if props.show_displacement_lines and 'lines' in _cache.batches:
-        gpu.state.line_width_set(props.line_thickness)
-        shader.uniform_float("color", props.line_color)
-        _cache.batches['lines'].draw(shader)
+    # Rebuild if stale.  We catch any exception so a transient Blender
+    # internal error never crashes the whole viewport draw loop.  In the
+    # background mode the previous batches keep being drawn until the
+    # worker's result has been uploaded.
+    playing  = _is_playing(context, props)
+    throttle = playing and props.mix_mode and _playback.frames < props.playback_interval
+    if playing and props.mix_mode and not throttle:
+        _playback.frames = 0
+    for obj in objs:
+        if _cache.is_valid(obj, props.mix_mode) or (throttle and _has_mix_geometry(obj)):
+            continue
+        try:
+            if props.background_analysis:
+                request_background_analysis(obj, props, playing)
+            else:
+                build_gpu_batches(context, obj)
+        except Exception:
+            continue
+
+    shader = _cache.line_shader
+
+    for obj in objs:
+        entry = _cache.objects.get(obj.name)
+        # If we still have nothing to draw, skip this object cleanly.  The
+        # marker / line batches are built below, so a key whose affected
+        # vertices touch no faces has no batches yet but still draws.
+        if entry is None or entry.aff_delta is None:
+            continue
+
+        # Value preview: the green markers and line ends slide along the
+        # cached displacement through the shader's scale uniform, which is
+        # also how playback follows an animated value.  In mix mode the
+        # values are already part of the geometry.
+        follow_value = props.preview_key_value or playing
+        value_scale  = obj.active_shape_key.value if follow_value and not props.mix_mode else 1.0
+
+        rv3d    = context.region_data
+        to_clip = None if rv3d is None else np.array(rv3d.perspective_matrix) @ np.array(obj.matrix_world)
+
+        # Frustum culling: when part of a chunked key is off screen, only
+        # the visible chunks are drawn.  Marker LOD: the budget applies when
+        # the object fills the view, shrinks with its on-screen size and is
+        # spent on visible chunks only.  Face fill is never thinned.
+        parts = None
+        if not props.show_heatmap:
+            visible = None
+            if props.use_frustum_culling and entry.chunks is not None and to_clip is not None:
+                visible = entry.chunks.visible(to_clip)
+                if visible.all():
+                    visible = None
+            level = len(entry.lod_levels) - 1
+            if props.use_marker_lod:
+                budget = props.marker_budget * _screen_fraction(context.region, to_clip, entry.aff_bounds)
+                level  = entry.marker_level(budget, visible)
+            if visible is None:
+                entry.use_marker_level(shader, level)
+            else:
+                parts = entry.chunk_parts(shader, level, visible)
+
+        # Batches are in object space; the object's transform goes in
+        # through the model matrix, so moving it never rebuilds anything.
+        with gpu.matrix.push_pop():
+            gpu.matrix.multiply_matrix(obj.matrix_world)
+            if props.show_heatmap:
+                # One draw call: faces coloured by displacement magnitude,
+                # or by asymmetry against the key's mirror partner.
+                values = _asymmetry_magnitude(obj, entry, props) if props.show_asymmetry else None
+                batch  = entry.heatmap_batch(_cache.heatmap_shader, props, values)
+                if batch is not None:
+                    gpu.state.blend_set('ALPHA')
+                    _cache.heatmap_shader.bind()
+                    batch.draw(_cache.heatmap_shader)
+            else:
+                _draw_object_batches([entry.batches] if parts is None else parts, props, value_scale)
 
     gpu.state.blend_set('NONE')
+    _profiler.stop("draw", start)
 
 # --- UI & PROPERTIES ---
 
+def update_profiler(self, context):
+    _profiler.configure(self.profiling, bpy.path.abspath(self.profile_log_path))
+
+
 def update_tag(self, context):
-    # Invalidate the cache whenever a property changes so the next redraw
-    # rebuilds geometry with the new settings.
-    _cache.clear()
+    # Colours, thicknesses and layer toggles are applied at draw time, so
+    # the cached batches stay valid; the viewport only needs a redraw.
+    # Anything that changes which geometry exists must clear _cache itself.
     for area in context.screen.areas:
         if area.type == 'VIEW_3D':
             area.tag_redraw()
@@ -313,16 +2373,25 @@ def update_tag(self, context):
 class BlendshapeVisualizerProperties(PropertyGroup):
 
     def toggle_h(self, context):
-        global _draw_handler
+        global _draw_handler, _overlay_handler
         if self.toggle_visualization:
             if not _draw_handler:
                 _draw_handler = bpy.types.SpaceView3D.draw_handler_add(
                     draw_visualizer_callback, (), 'WINDOW', 'POST_VIEW')
+            if not _overlay_handler:
+                _overlay_handler = bpy.types.SpaceView3D.draw_handler_add(
+                    draw_status_overlay_callback, (), 'WINDOW', 'POST_PIXEL')
         else:
             if _draw_handler:
                 bpy.types.SpaceView3D.draw_handler_remove(_draw_handler, 'WINDOW')
                 _draw_handler = None
+            if _overlay_handler:
+                bpy.types.SpaceView3D.draw_handler_remove(_overlay_handler, 'WINDOW')
+                _overlay_handler = None
+            _worker.cancel_all()
             _cache.clear()
+            _face_vbo_cache.clear()
+            _mix_states.clear()
         update_tag(self, context)
 
     toggle_visualization:        BoolProperty(name="Enable Visualization", default=False, update=toggle_h)
@@ -331,6 +2400,57 @@ class BlendshapeVisualizerProperties(PropertyGroup):
     show_original_x:             BoolProperty(name="Show Original X Markers",      default=True,  update=update_tag)
     show_face_fill:              BoolProperty(name="Show Face Fill",               default=True,  update=update_tag)
     show_grid_lines:             BoolProperty(name="Show Grid Lines",              default=True,  update=update_tag)
+    show_heatmap:                BoolProperty(name="Heatmap Mode",                 default=False, update=update_tag,
+                                              description="Colour affected faces by displacement magnitude instead of drawing markers")
+    preview_key_value:           BoolProperty(name="Preview at Key Value",         default=False, update=update_tag,
+                                              description="Place displacement markers and lines at the key's current value instead of at full strength")
+    multi_object:                BoolProperty(name="All Selected Meshes",          default=False, update=update_tag,
+                                              description="Visualize the active shape key of every selected mesh, not just the active object")
+    background_analysis:         BoolProperty(name="Background Analysis",          default=True,  update=update_tag,
+                                              description="Analyse shape keys on a worker thread so large rebuilds don't freeze the viewport")
+    use_marker_lod:              BoolProperty(name="Marker LOD",                   default=True,  update=update_tag,
+                                              description="Thin out X markers and displacement lines on dense meshes, keeping one per voxel cell")
+    marker_budget:               IntProperty(name="Marker Budget",                 default=20000, min=100, max=10000000, update=update_tag,
+                                             description="Markers drawn per object when it fills the viewport; fewer as it shrinks on screen")
+    use_frustum_culling:         BoolProperty(name="Frustum Culling",              default=True,  update=update_tag,
+                                              description="Skip the parts of large keys that are outside the view")
+    live_edit_mode:              BoolProperty(name="Live Edit Mode",               default=True,  update=update_tag,
+                                              description="Follow changes to the shape key while editing it in Edit Mode")
+    show_asymmetry:              BoolProperty(name="Show Asymmetry",               default=False, update=update_tag,
+                                              description="In heatmap mode, colour the active key by how far it is from mirroring its pair partner")
+    mirror_tolerance:            FloatProperty(name="Mirror Tolerance", default=0.0001, min=1e-6, max=0.1, precision=5,
+                                               subtype='DISTANCE',
+                                               description="How far a vertex may be from the reflection of its mirror vertex")
+    playback_mode:               BoolProperty(name="Playback Aware",               default=True,  update=update_tag,
+                                              description="While the timeline plays, follow animated key values without rebuilding, "
+                                                          "and refresh Mix Preview geometry only every few frames")
+    playback_interval:           IntProperty(name="Refresh Every",                 default=5, min=1, max=120, update=update_tag,
+                                             description="Frames between Mix Preview refreshes during playback")
+    mix_mode:                    BoolProperty(name="Mix Preview",                  default=False, update=update_tag,
+                                              description="Show the combined result of all unmuted keys at their current values "
+                                                          "instead of the active key alone.  Per-key displacements are kept in "
+                                                          "the key precompute cache")
+
+    profiling:        BoolProperty(name="Profiling", default=False, update=update_profiler,
+                                   description="Time each rebuild and draw stage and show rolling statistics")
+    profile_log_path: StringProperty(name="Log File", default="", subtype='FILE_PATH', update=update_profiler,
+                                     description="Also append every timing to this file as JSON lines (empty: no log)")
+
+    use_key_precompute:   BoolProperty(name="Key Precompute Cache", default=False, update=update_tag,
+                                       description="Keep every analysed shape key in memory so switching back to it needs no shape key reads")
+    precompute_budget_mb: IntProperty(name="Memory Budget (MB)", default=256, min=16, max=65536,
+                                      description="Least recently used keys are dropped once the cache grows past this size")
+    precompute_precision: EnumProperty(
+        name="Precision",
+        items=[('FLOAT16', "Half", "Store displacements as float16 (half the memory)"),
+               ('FLOAT32', "Full", "Store displacements as float32")],
+        default='FLOAT16')
+    use_disk_cache:       BoolProperty(name="Disk Cache", default=False, update=update_tag,
+                                       description="Save analysis results in a folder next to the .blend file, "
+                                                   "so keys seen in an earlier session aren't analysed again")
+    disk_cache_budget_mb: IntProperty(name="Disk Budget (MB)", default=1024, min=16, max=1048576,
+                                      description="Least recently used results are deleted once the disk cache "
+                                                  "folder grows past this")
 
     face_highlight_color: FloatVectorProperty(name="Face Color",           subtype='COLOR', size=4, default=(1.0, 0.5, 0.0, 0.4), min=0, max=1, update=update_tag)
     red_x_color:          FloatVectorProperty(name="Red X Color",          subtype='COLOR', size=4, default=(1.0, 0.0, 0.0, 1.0), min=0, max=1, update=update_tag)
@@ -342,6 +2462,19 @@ class BlendshapeVisualizerProperties(PropertyGroup):
     green_x_thickness:    FloatProperty(name="Green X Thick", default=1.0, min=0.1, max=10.0, update=update_tag)
     line_thickness:       FloatProperty(name="Line Thick",   default=1.0, min=0.1, max=10.0, update=update_tag)
     grid_line_thickness:  FloatProperty(name="Grid Thick",   default=1.0, min=0.1, max=10.0, update=update_tag)
+    marker_size:          FloatProperty(name="Marker Size",  default=12.0, min=2.0, max=64.0, subtype='PIXEL', update=update_tag,
+                                        description="Size of the X markers on screen, whatever the object's scale")
+
+    heatmap_ramp: EnumProperty(
+        name="Ramp",
+        items=[('HEAT',      "Heat",      "Blue through green to red"),
+               ('VIRIDIS',   "Viridis",   "Perceptually uniform purple to yellow"),
+               ('GRAYSCALE', "Grayscale", "Black to white"),
+               ('CUSTOM',    "Custom",    "Blend between the low and high colours")],
+        default='HEAT', update=update_tag)
+    heatmap_low_color:    FloatVectorProperty(name="Low",  subtype='COLOR', size=3, default=(0.0, 0.0, 1.0), min=0, max=1, update=update_tag)
+    heatmap_high_color:   FloatVectorProperty(name="High", subtype='COLOR', size=3, default=(1.0, 0.0, 0.0), min=0, max=1, update=update_tag)
+    heatmap_alpha:        FloatProperty(name="Heatmap Alpha", default=0.6, min=0.0, max=1.0, update=update_tag)
 
     selected_theme: EnumProperty(
         name="Theme",
@@ -413,18 +2546,319 @@ class BLENDSHAPE_OT_ImportTheme(Operator):
         return {'FINISHED'}
 
 
+class BLENDSHAPE_OT_ClearDiskCache(Operator):
+    """Delete the analysis results saved next to this .blend file"""
+    bl_idname = "blendshape.clear_disk_cache"
+    bl_label  = "Clear Disk Cache"
+
+    @classmethod
+    def poll(cls, context):
+        directory = _sidecar_dir()
+        return directory is not None and os.path.isdir(directory)
+
+    def execute(self, context):
+        clear_sidecar_cache()
+        return {'FINISHED'}
+
+
+class BLENDSHAPE_OT_PrecomputeKeys(Operator):
+    """Analyse every shape key on the active object and keep the results in memory"""
+    bl_idname = "blendshape.precompute_keys"
+    bl_label  = "Precompute All Keys"
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.active_object
+        return obj is not None and obj.type == 'MESH' and obj.data.shape_keys is not None
+
+    def execute(self, context):
+        props      = context.scene.blendshape_visualizer
+        mesh       = context.active_object.data
+        key_blocks = mesh.shape_keys.key_blocks
+        reference  = mesh.shape_keys.reference_key
+        num_verts  = len(mesh.vertices)
+        half_precision = props.precompute_precision == 'FLOAT16'
+        _key_store.set_budget(props.precompute_budget_mb * 1024 * 1024)
+
+        # Keys are streamed one at a time; only relative keys stay resident,
+        # and each of those is read once however many keys are based on it.
+        relative_cos = {}
+        sk_buf = np.empty(num_verts * 3, dtype=np.float32)
+        stored = 0
+        wm = context.window_manager
+        wm.progress_begin(0, len(key_blocks))
+        try:
+            for i, sk in enumerate(key_blocks):
+                wm.progress_update(i)
+                basis = sk.relative_key if sk.relative_key else reference
+                if sk.name == basis.name:
+                    continue
+                if basis.name not in relative_cos:
+                    relative_cos[basis.name] = _read_shape_key_cos_safe(basis, num_verts)
+                basis_cos = relative_cos[basis.name]
+                sk_cos    = _read_shape_key_cos_safe(sk, num_verts, out=sk_buf)
+                if basis_cos is None or sk_cos is None:
+                    continue
+
+                status, affected_mask = _find_affected(basis_cos, sk_cos)
+                if status == AnalysisResult.REJECTED:
+                    continue
+                aff_idx = np.where(affected_mask)[0] if affected_mask is not None else np.zeros(0, dtype=np.int32)
+                _key_store.store(KeyPrecomputeStore.keys_for(mesh, num_verts, sk, basis),
+                                 basis_cos, sk_cos, aff_idx, half_precision)
+                stored += 1
+        finally:
+            wm.progress_end()
+
+        self.report({'INFO'}, f"Precomputed {stored} shape key(s); cache holds "
+                              f"{len(_key_store)} entries, {_key_store.nbytes / 1048576:.1f} MB.")
+        return {'FINISHED'}
+
+
+class BLENDSHAPE_OT_FindSymmetricPairs(Operator):
+    """Find the active object's L/R shape key pairs and how far each pair is from mirroring the other"""
+    bl_idname = "blendshape.find_symmetric_pairs"
+    bl_label  = "Find Symmetric Pairs"
+
+    max_error: FloatProperty(
+        name="Max Error", default=0.25, min=0.0, max=1.0, subtype='FACTOR',
+        description="Largest asymmetry, relative to the keys' displacement, still listed as a pair")
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.active_object
+        return obj is not None and obj.type == 'MESH' and obj.data.shape_keys is not None
+
+    def execute(self, context):
+        obj   = context.active_object
+        props = context.scene.blendshape_visualizer
+        start = time.perf_counter()
+        pairs = find_symmetric_pairs(obj, props, props.mirror_tolerance, self.max_error)
+        if pairs is None:
+            self.report({'ERROR'}, "Could not read the basis shape key.")
+            return {'CANCELLED'}
+        _symmetry_pairs[obj.name] = pairs
+        entry = _cache.objects.get(obj.name)
+        if entry is not None:
+            entry.asymmetry_of = None
+        update_tag(self, context)
+        self.report({'INFO'}, f"Found {len(pairs)} symmetric pair(s) in {time.perf_counter() - start:.1f} s.")
+        return {'FINISHED'}
+
+
+# --- KEY REPORT ---
+
+_REPORT_FIELDS = ("object", "key", "relative_key", "vertices", "affected", "empty",
+                  "max_displacement", "mean_displacement",
+                  "min_x", "min_y", "min_z", "max_x", "max_y", "max_z")
+
+
+def _key_report_row(basis_cos, sk_cos, threshold):
+    """
+    Displacement statistics of one key against its relative key.  The
+    maximum is over every vertex, so a key below the threshold still
+    reports how far it moves; the mean and the bounding box cover the
+    affected vertices (at their relative-key positions), and the box is
+    None for an empty key.
+    """
+    diffs    = sk_cos - basis_cos
+    sq_dist  = np.einsum('ij,ij->i', diffs, diffs)
+    affected = np.flatnonzero(sq_dist > threshold * threshold)
+    row = {"vertices": len(basis_cos), "affected": len(affected), "empty": not len(affected),
+           "max_displacement": float(np.sqrt(sq_dist.max())) if len(sq_dist) else 0.0,
+           "mean_displacement": 0.0}
+    if len(affected):
+        region = basis_cos[affected]
+        row["mean_displacement"] = float(np.sqrt(sq_dist[affected]).mean())
+        row.update(zip(("min_x", "min_y", "min_z"), region.min(axis=0).tolist()))
+        row.update(zip(("max_x", "max_y", "max_z"), region.max(axis=0).tolist()))
+    else:
+        row.update(dict.fromkeys(("min_x", "min_y", "min_z", "max_x", "max_y", "max_z")))
+    return row
+
+
+def _iter_key_report(objects, threshold):
+    """
+    Yield a report row for every non-reference key block of every mesh.
+    Keys are streamed through one reused buffer; only the relative keys of
+    the current mesh stay resident, so memory is bounded by the largest
+    mesh rather than the rig.
+    """
+    for obj in objects:
+        mesh = obj.data
+        if mesh.shape_keys is None:
+            continue
+        reference = mesh.shape_keys.reference_key
+        num_verts = len(mesh.vertices)
+        relative_cos = {}
+        sk_buf = np.empty(num_verts * 3, dtype=np.float32)
+        for sk in mesh.shape_keys.key_blocks:
+            basis = sk.relative_key if sk.relative_key else reference
+            if sk.name == basis.name:
+                continue
+            if basis.name not in relative_cos:
+                relative_cos[basis.name] = _read_shape_key_cos_safe(basis, num_verts)
+            basis_cos = relative_cos[basis.name]
+            sk_cos    = _read_shape_key_cos_safe(sk, num_verts, out=sk_buf)
+            if basis_cos is None or sk_cos is None:
+                continue
+            row = {"object": obj.name, "key": sk.name, "relative_key": basis.name}
+            row.update(_key_report_row(basis_cos, sk_cos, threshold))
+            yield row
+
+
+class BLENDSHAPE_OT_ExportKeyReport(Operator, ExportHelper):
+    """Analyse every shape key on the selected meshes and export the statistics"""
+    bl_idname = "blendshape.export_key_report"
+    bl_label  = "Export Key Report"
+
+    filename_ext    = ".csv"
+    check_extension = None   # the extension follows file_format instead
+    filter_glob: StringProperty(default="*.csv;*.json", options={'HIDDEN'})
+    file_format: EnumProperty(
+        name="Format",
+        items=[('CSV',  "CSV",  "One row per shape key"),
+               ('JSON', "JSON", "A list with one object per shape key")],
+        default='CSV')
+    threshold: FloatProperty(
+        name="Threshold", default=0.001, min=0.0, precision=5, subtype='DISTANCE',
+        description="Minimum displacement for a vertex to count as affected")
+
+    @classmethod
+    def poll(cls, context):
+        return any(obj.type == 'MESH' for obj in context.selected_objects)
+
+    def _report_path(self):
+        """filepath with a .csv / .json extension swapped for, or else followed by, file_format's."""
+        ext = "." + self.file_format.lower()
+        root, old = os.path.splitext(self.filepath)
+        return root + ext if old.lower() in {".csv", ".json"} else self.filepath + ext
+
+    def check(self, context):
+        # Keeps the file browser's name in step with the chosen format.
+        filepath = self._report_path()
+        changed  = filepath != self.filepath
+        self.filepath = filepath
+        return changed
+
+    def execute(self, context):
+        objects  = [obj for obj in context.selected_objects if obj.type == 'MESH']
+        filepath = self._report_path()
+        start    = time.perf_counter()
+        keys = empty = 0
+        try:
+            with open(filepath, "w", newline="", encoding="utf-8") as f:
+                rows = _iter_key_report(objects, self.threshold)
+                if self.file_format == 'JSON':
+                    rows = list(rows)
+                    json.dump(rows, f, indent=1)
+                    keys, empty = len(rows), sum(row["empty"] for row in rows)
+                else:
+                    writer = csv.DictWriter(f, fieldnames=_REPORT_FIELDS)
+                    writer.writeheader()
+                    for row in rows:
+                        writer.writerow(row)
+                        keys  += 1
+                        empty += row["empty"]
+        except OSError as e:
+            self.report({'ERROR'}, f"Could not write {filepath}: {e}")
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"Reported {keys} shape key(s) on {len(objects)} mesh(es), {empty} empty, "
+                              f"in {time.perf_counter() - start:.1f} s.")
+        return {'FINISHED'}
+
+
+def _write_vertex_selection(mesh, vert_select):
+    """
+    Bulk-write a per-vertex selection (object mode only), deriving edge and
+    face selection from it the way a vertex-mode flush would.
+    """
+    vert_hide = np.empty(len(mesh.vertices), dtype=bool)
+    mesh.vertices.foreach_get("hide", vert_hide)
+    vert_select = vert_select & ~vert_hide
+
+    edge_verts = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    edge_hide  = np.empty(len(mesh.edges), dtype=bool)
+    mesh.edges.foreach_get("vertices", edge_verts)
+    mesh.edges.foreach_get("hide", edge_hide)
+    edge_select = vert_select[edge_verts.reshape(-1, 2)].all(axis=1) & ~edge_hide
+
+    topo = get_mesh_topology(mesh)
+    poly_hide = np.empty(len(mesh.polygons), dtype=bool)
+    mesh.polygons.foreach_get("hide", poly_hide)
+    poly_select = np.zeros(len(mesh.polygons), dtype=bool)
+    if len(poly_select):
+        selected_corners = np.add.reduceat(vert_select[topo.corner_verts].astype(np.int32), topo.poly_offsets)
+        poly_select = (selected_corners == topo.poly_sizes) & ~poly_hide
+
+    mesh.vertices.foreach_set("select", vert_select)
+    mesh.edges.foreach_set("select", edge_select)
+    mesh.polygons.foreach_set("select", poly_select)
+    return int(vert_select.sum())
+
+
 class BLENDSHAPE_OT_SelectAffected(Operator):
-    bl_idname = "blendshape.select_affected"
-    bl_label  = "Select Affected"
+    """Select the vertices the active shape key moves away from its relative key"""
+    bl_idname  = "blendshape.select_affected"
+    bl_label   = "Select Affected"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    threshold: FloatProperty(
+        name="Threshold", default=0.001, min=0.0, precision=5, subtype='DISTANCE',
+        description="Minimum displacement for a vertex to count as affected")
+    mode: EnumProperty(
+        name="Mode",
+        items=[('SET',       "Set",       "Replace the current selection"),
+               ('EXTEND',    "Extend",    "Add affected vertices to the current selection"),
+               ('SUBTRACT',  "Subtract",  "Remove affected vertices from the current selection"),
+               ('INTERSECT', "Intersect", "Keep only selected vertices that are also affected")],
+        default='SET')
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.object
+        return obj is not None and obj.type == 'MESH' and obj.active_shape_key is not None
 
     def execute(self, context):
         obj   = context.object
+        mesh  = obj.data
         sk    = obj.active_shape_key
-        basis = obj.data.shape_keys.reference_key
-        bm    = bmesh.from_edit_mesh(obj.data)
-        for v in bm.verts:
-            v.select = (sk.data[v.index].co - basis.data[v.index].co).length_squared > 1e-6
-        bmesh.update_edit_mesh(obj.data)
+        basis = sk.relative_key if sk.relative_key else mesh.shape_keys.reference_key
+
+        # Edit-mode shape key changes only reach the mesh when leaving edit
+        # mode, and bulk selection writes only stick in object mode, so the
+        # whole operation happens in one object-mode round trip.
+        was_edit = obj.mode == 'EDIT'
+        if was_edit:
+            bpy.ops.object.mode_set(mode='OBJECT')
+        try:
+            num_verts = len(mesh.vertices)
+            sk_cos    = _read_shape_key_cos_safe(sk, num_verts)
+            basis_cos = _read_shape_key_cos_safe(basis, num_verts)
+            if sk_cos is None or basis_cos is None:
+                self.report({'ERROR'}, "Could not read shape key data.")
+                return {'CANCELLED'}
+
+            diffs    = sk_cos - basis_cos
+            affected = np.einsum('ij,ij->i', diffs, diffs) > self.threshold ** 2
+
+            current = np.empty(num_verts, dtype=bool)
+            mesh.vertices.foreach_get("select", current)
+            if self.mode == 'EXTEND':
+                select = current | affected
+            elif self.mode == 'SUBTRACT':
+                select = current & ~affected
+            elif self.mode == 'INTERSECT':
+                select = current & affected
+            else:
+                select = affected
+            selected = _write_vertex_selection(mesh, select)
+        finally:
+            if was_edit:
+                bpy.ops.object.mode_set(mode='EDIT')
+
+        self.report({'INFO'}, f"{int(affected.sum())} affected vertices, {selected} selected.")
         return {'FINISHED'}
 
 
@@ -448,6 +2882,25 @@ class BLENDSHAPE_PT_Panel(Panel):
         col.prop(props, "show_original_x")
         col.prop(props, "show_face_fill")
         col.prop(props, "show_grid_lines")
+        col.prop(props, "preview_key_value")
+        col.prop(props, "multi_object")
+        col.prop(props, "background_analysis")
+        row = col.row(align=True)
+        row.prop(props, "use_marker_lod")
+        sub = row.row(align=True)
+        sub.active = props.use_marker_lod
+        sub.prop(props, "marker_budget", text="")
+        col.prop(props, "use_frustum_culling")
+        col.prop(props, "live_edit_mode")
+        col.prop(props, "mix_mode")
+        state = _mix_states.get(context.active_object.name) if props.mix_mode and context.active_object else None
+        if state is not None and state.skipped:
+            col.label(text="Left out of mix: " + ", ".join(state.skipped), icon='ERROR')
+        row = col.row(align=True)
+        row.prop(props, "playback_mode")
+        sub = row.row(align=True)
+        sub.active = props.playback_mode and props.mix_mode
+        sub.prop(props, "playback_interval", text="")
 
         box = layout.box()
         box.label(text="Colors & Thickness")
@@ -456,6 +2909,68 @@ class BLENDSHAPE_PT_Panel(Panel):
         box.prop(props, "green_x_color")
         box.prop(props, "grid_line_color")
         box.prop(props, "line_color")
+        box.prop(props, "marker_size")
+
+        box = layout.box()
+        box.prop(props, "show_heatmap")
+        sub = box.column()
+        sub.active = props.show_heatmap
+        sub.prop(props, "heatmap_ramp")
+        if props.heatmap_ramp == 'CUSTOM':
+            row = sub.row(align=True)
+            row.prop(props, "heatmap_low_color")
+            row.prop(props, "heatmap_high_color")
+        sub.prop(props, "heatmap_alpha")
+
+        box = layout.box()
+        row = box.row(align=True)
+        row.operator("blendshape.find_symmetric_pairs", icon='MOD_MIRROR')
+        row.prop(props, "mirror_tolerance", text="")
+        pairs = _symmetry_pairs.get(context.active_object.name) if context.active_object else None
+        if pairs is not None:
+            box.prop(props, "show_asymmetry")
+            col = box.column(align=True)
+            for a, b, error in pairs[:10]:
+                col.label(text=f"{a} / {b}: {error * 100.0:.1f} %")
+            if len(pairs) > 10:
+                col.label(text=f"… and {len(pairs) - 10} more")
+            if not pairs:
+                col.label(text="No pairs found")
+
+        box = layout.box()
+        box.prop(props, "use_key_precompute")
+        sub = box.column()
+        sub.active = props.use_key_precompute
+        sub.prop(props, "precompute_precision")
+        sub.prop(props, "precompute_budget_mb")
+        sub.operator("blendshape.precompute_keys", icon='FILE_REFRESH')
+        sub.label(text=f"Cached: {len(_key_store)} entries, {_key_store.nbytes / 1048576:.1f} MB")
+        row = box.row(align=True)
+        row.prop(props, "use_disk_cache")
+        row.operator("blendshape.clear_disk_cache", text="", icon='TRASH')
+        sub = box.column()
+        sub.active = props.use_disk_cache
+        sub.prop(props, "disk_cache_budget_mb")
+
+        stats = _read_stats
+        col = layout.column(align=True)
+        col.label(text=f"Reads: {stats.reads}  ({stats.seconds * 1000.0:.0f} ms)")
+        col.label(text=f"Mismatches: {stats.mismatches}  Fallbacks: {stats.fallbacks}")
+        layout.operator("blendshape.export_key_report", icon='EXPORT')
+
+        box = layout.box()
+        box.prop(props, "profiling")
+        if props.profiling:
+            box.prop(props, "profile_log_path")
+            col = box.column(align=True)
+            for stage, mean_ms, max_ms, samples in _profiler.summary():
+                col.label(text=f"{stage}: {mean_ms:.1f} ms avg, {max_ms:.1f} ms max  ({samples})")
+            counts = _profiler.counts
+            if counts:
+                col.label(text=f"Verts: {counts.get('verts', 0)}  Polys: {counts.get('polygons', 0)}")
+                col.label(text=f"Affected: {counts.get('affected', 0)}  Tris: {counts.get('tris', 0)}")
+                uploaded = counts.get('upload_bytes', 0) + counts.get('marker_bytes', 0)
+                col.label(text=f"Uploaded: {uploaded / 1048576:.1f} MB")
 
         layout.label(text="Themes:")
         layout.prop(props, "selected_theme", text="")
@@ -476,6 +2991,10 @@ classes = (
     BLENDSHAPE_OT_SaveTheme,
     BLENDSHAPE_OT_CopyTheme,
     BLENDSHAPE_OT_ImportTheme,
+    BLENDSHAPE_OT_ClearDiskCache,
+    BLENDSHAPE_OT_PrecomputeKeys,
+    BLENDSHAPE_OT_FindSymmetricPairs,
+    BLENDSHAPE_OT_ExportKeyReport,
     BLENDSHAPE_OT_SelectAffected,
     BLENDSHAPE_PT_Panel,
 )
@@ -486,13 +3005,37 @@ def register():
         bpy.utils.register_class(cls)
     bpy.types.Scene.blendshape_visualizer = bpy.props.PointerProperty(
         type=BlendshapeVisualizerProperties)
+    bpy.app.handlers.depsgraph_update_post.append(_on_depsgraph_update)
+    bpy.app.handlers.frame_change_post.append(_on_frame_change)
 
 
 def unregister():
-    global _draw_handler
+    global _draw_handler, _overlay_handler
     if _draw_handler:
         bpy.types.SpaceView3D.draw_handler_remove(_draw_handler, 'WINDOW')
         _draw_handler = None
+    if _overlay_handler:
+        bpy.types.SpaceView3D.draw_handler_remove(_overlay_handler, 'WINDOW')
+        _overlay_handler = None
+    if bpy.app.timers.is_registered(_poll_background_analysis):
+        bpy.app.timers.unregister(_poll_background_analysis)
+    if _on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_on_depsgraph_update)
+    if _on_frame_change in bpy.app.handlers.frame_change_post:
+        bpy.app.handlers.frame_change_post.remove(_on_frame_change)
+    if bpy.app.timers.is_registered(_sync_edit_mode):
+        bpy.app.timers.unregister(_sync_edit_mode)
+    _edit_dirty.clear()
+    _edit_synced.clear()
+    _edit_reads.clear()
+    _worker.shutdown()
+    _topology_cache.clear()
+    _face_vbo_cache.clear()
+    _key_store.clear()
+    _mix_states.clear()
+    _mirror_cache.clear()
+    _symmetry_pairs.clear()
+    _profiler.configure(False)
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
     del bpy.types.Scene.blendshape_visualizer